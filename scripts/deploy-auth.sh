@@ -11,6 +11,9 @@ set -euo pipefail
 : "${REGION:=europe-west1}"
 : "${SOURCE_DIR:=services/auth-service}"
 : "${MIN_INSTANCES:=1}"
+# Session checks are Firestore/Discord I/O, so one instance serves many at once
+: "${CONCURRENCY:=40}"
+: "${CPU:=1}"
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 PROJECT_ROOT="$(cd "${SCRIPT_DIR}/.." && pwd)"
@@ -63,11 +66,13 @@ gcloud functions deploy "${SERVICE_NAME}" \
   --trigger-http \
   --allow-unauthenticated \
   --project="${PROJECT_ID}" \
-  --set-env-vars="GCP_PROJECT_ID=${PROJECT_ID},ENVIRONMENT=production,FIRESTORE_DATABASE=guidon-db" \
+  --set-env-vars="GCP_PROJECT_ID=${PROJECT_ID},ENVIRONMENT=production,FIRESTORE_DATABASE=guidon-db,THREADS=${CONCURRENCY}" \
   --set-secrets="DISCORD_CLIENT_ID=DISCORD_CLIENT_ID:latest,DISCORD_CLIENT_SECRET=DISCORD_CLIENT_SECRET:latest,DISCORD_REDIRECT_URI=DISCORD_REDIRECT_URI:latest,WEB_FRONTEND_URL=WEB_FRONTEND_URL:latest" \
   --timeout=300s \
   --min-instances="${MIN_INSTANCES}" \
   --memory=512MB \
+  --cpu="${CPU}" \
+  --concurrency="${CONCURRENCY}" \
   2>&1 | grep -v "No change" || true
 
 SERVICE_URL=$(gcloud functions describe "${SERVICE_NAME}" --gen2 --region="${REGION}" --project="${PROJECT_ID}" --format="value(serviceConfig.uri)")
@@ -11,6 +11,10 @@ set -euo pipefail
 : "${REGION:=europe-west1}"
 : "${SOURCE_DIR:=services/proxy}"
 : "${MIN_INSTANCES:=1}"
+# The proxy only waits on I/O (signature check, auth-service, Pub/Sub), so a
+# single instance serves many interactions at once on Functions Framework threads.
+: "${CONCURRENCY:=40}"
+: "${CPU:=1}"
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 PROJECT_ROOT="$(cd "${SCRIPT_DIR}/.." && pwd)"
@@ -59,7 +63,7 @@ if [ -z "${AUTH_SERVICE_URL:-}" ]; then
     AUTH_SERVICE_URL=$(gcloud functions describe discord-auth-service --gen2 --region="${REGION}" --project="${PROJECT_ID}" --format="value(serviceConfig.uri)" 2>/dev/null || echo "")
 fi
 
-ENV_VARS="GCP_PROJECT_ID=${PROJECT_ID},ENVIRONMENT=production"
+ENV_VARS="GCP_PROJECT_ID=${PROJECT_ID},ENVIRONMENT=production,THREADS=${CONCURRENCY}"
 if [ ! -z "${USER_MANAGER_URL}" ]; then
     ENV_VARS="${ENV_VARS},USER_MANAGER_URL=${USER_MANAGER_URL}"
 fi
@@ -82,6 +86,18 @@ gcloud functions deploy "${SERVICE_NAME}" \
   --timeout=300s \
   --min-instances="${MIN_INSTANCES}" \
   --memory=512MB \
+  --cpu="${CPU}" \
+  --concurrency="${CONCURRENCY}" \
+  2>&1 | grep -v "No change" || true
+
+# Startup CPU boost on the underlying Cloud Run service: cold starts import the
+# handlers and connect the Pub/Sub channel with extra CPU before the first request
+echo "Enabling startup CPU boost..."
+gcloud run services update "${SERVICE_NAME}" \
+  --region="${REGION}" \
+  --project="${PROJECT_ID}" \
+  --cpu-boost \
+  --quiet \
   2>&1 | grep -v "No change" || true
 
 SERVICE_URL=$(gcloud functions describe "${SERVICE_NAME}" --gen2 --region="${REGION}" --project="${PROJECT_ID}" --format="value(serviceConfig.uri)")
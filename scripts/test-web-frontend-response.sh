@@ -0,0 +1,63 @@
+#!/usr/bin/env bash
+
+set -euo pipefail
+
+# Test script for the web-frontend /response/<token> long-poll endpoint
+# Usage: ./test-web-frontend-response.sh [BASE_URL]
+# If BASE_URL is not provided, uses the App Engine default hostname
+
+: "${PROJECT_ID:=serverless-ejguidon-dev}"
+
+if [ $# -eq 0 ]; then
+    WEB_FRONTEND_HOST=$(gcloud app describe --project="${PROJECT_ID}" --format="value(defaultHostname)" 2>/dev/null || echo "")
+    if [ -z "${WEB_FRONTEND_HOST}" ]; then
+        echo "Error: web-frontend not found."
+        exit 1
+    fi
+    BASE_URL="https://${WEB_FRONTEND_HOST}"
+else
+    BASE_URL="$1"
+fi
+
+echo "Testing web-frontend /response/<token>"
+echo "Base URL: ${BASE_URL}"
+echo ""
+
+# Colors for output
+GREEN='\033[0;32m'
+RED='\033[0;31m'
+NC='\033[0m'
+
+FAILED=0
+
+# A missing token must answer within the request timeout for any wait value:
+# invalid and non-finite values are treated as wait=0
+check_wait() {
+    local wait_value="$1"
+    local max_time="$2"
+    local status
+
+    status=$(curl -s -o /dev/null -w '%{http_code}' --max-time "${max_time}" \
+        "${BASE_URL}/response/test-missing-token?wait=${wait_value}" || true)
+
+    if [ "${status}" = "000" ]; then
+        echo -e "${RED}FAIL${NC} wait=${wait_value}: no response within ${max_time}s"
+        FAILED=1
+    else
+        echo -e "${GREEN}OK${NC}   wait=${wait_value}: HTTP ${status}"
+    fi
+}
+
+check_wait "nan" 5
+check_wait "inf" 5
+check_wait "-inf" 5
+check_wait "abc" 5
+check_wait "-1" 5
+check_wait "1" 5
+
+echo ""
+if [ "${FAILED}" -ne 0 ]; then
+    echo -e "${RED}Some tests failed${NC}"
+    exit 1
+fi
+echo -e "${GREEN}All tests passed${NC}"
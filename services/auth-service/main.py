@@ -3,6 +3,7 @@ OAuth2 Discord Authentication Service using Functions Framework for Cloud Functi
 Junot est un boug suspect il sort dehors dans le froid sans manteau.
 """
 import os
+import json
 import requests
 import secrets
 from datetime import datetime, timedelta, timezone
@@ -11,6 +12,7 @@ from google.cloud import firestore
 from functions_framework import http
 from flask import jsonify, Request, make_response, Response
 from shared.correlation import with_correlation
+from shared.firestore_client import get_db
 from shared.observability import init_observability, traced_function
 from urllib.parse import urlencode
 
@@ -27,17 +29,13 @@ DISCORD_API_BASE_URL = "https://discord.com/api/v10"
 DISCORD_OAUTH_URL = "https://discord.com/api/oauth2/authorize"
 DISCORD_TOKEN_URL = "https://discord.com/api/oauth2/token"
 
-# --- Firestore / helpers ---
-_db_client = None
-FIRESTORE_DATABASE = os.environ.get("FIRESTORE_DATABASE", "guidon-db")
-
-# --- Firestore client (singleton) ---
-def get_db():
-    """Get Firestore client singleton."""
-    global _db_client
-    if _db_client is None:
-        _db_client = firestore.Client(database=FIRESTORE_DATABASE)
-    return _db_client
+# --- Health payload (static configuration, serialized once) ---
+_HEALTH_BODY = json.dumps({
+    'status': 'healthy',
+    'service': 'auth-service',
+    'configured': bool(DISCORD_CLIENT_ID and DISCORD_CLIENT_SECRET),
+    'framework': 'functions_framework'
+})
 
 
 def auto_redirect_response(target_url: str, message: str) -> Response:
@@ -478,12 +476,7 @@ def handle_health(request: Request):
     """Health check endpoint."""
     correlation_id = getattr(request, 'correlation_id', request.headers.get('X-Correlation-ID'))
     logger.info("Health check called", correlation_id=correlation_id)
-    return jsonify({
-        'status': 'healthy',
-        'service': 'auth-service',
-        'configured': bool(DISCORD_CLIENT_ID and DISCORD_CLIENT_SECRET),
-        'framework': 'functions_framework'
-    }), 200
+    return Response(_HEALTH_BODY, 200, mimetype='application/json')
 
 
 @traced_function("handle_login")
@@ -14,20 +14,11 @@ from google.cloud import storage
 from PIL import Image, ImageDraw, ImageFont
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from shared.firestore_client import get_db
 from shared.observability import init_observability
 
 logger, _ = init_observability('canvas-service', app=None)
 
-_db_client = None
-
-def get_db():
-    """Return Firestore client configured for the target database."""
-    global _db_client
-    if _db_client is None:
-        database_id = os.getenv('FIRESTORE_DATABASE', 'guidon-db')
-        _db_client = firestore.Client(database=database_id)
-    return _db_client
-
 
 def load_settings() -> Dict:
     """Load settings from setting.json file.
@@ -321,30 +312,24 @@ class CanvasManager:
 
             contributors_list = []
             if user_client and unique_contributors:
-                for user_id in unique_contributors[:50]:
-                    try:
-                        user_data = user_client._make_request(
-                            'GET',
-                            f'/api/users/{user_id}',
-                            correlation_id=correlation_id
-                        )
-                        if user_data:
-                            contributors_list.append({
-                                'id': user_id,
-                                'username': user_data.get('username', f'User {user_id}'),
-                                'avatar': user_data.get('avatar')
-                            })
-                    except Exception as e:
-                        logger.warning(
-                            "Failed to fetch contributor details",
-                            error=e,
-                            user_id=user_id,
-                            correlation_id=correlation_id
-                        )
+                contributor_ids = unique_contributors[:50]
+                try:
+                    users = user_client.get_users(contributor_ids, correlation_id=correlation_id)
+                except Exception as e:
+                    logger.warning(
+                        "Failed to fetch contributor details",
+                        error=e,
+                        correlation_id=correlation_id
+                    )
+                    users = {user_id: {} for user_id in contributor_ids}
+
+                for user_id in contributor_ids:
+                    user_data = users.get(user_id)
+                    if user_data is not None:
                         contributors_list.append({
                             'id': user_id,
-                            'username': f'User {user_id}',
-                            'avatar': None
+                            'username': user_data.get('username', f'User {user_id}'),
+                            'avatar': user_data.get('avatar')
                         })
 
             result = {
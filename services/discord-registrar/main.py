@@ -2,10 +2,11 @@
 Uses Functions Framework for Cloud Functions Gen2
 """
 import os
+import json
 import time
 import requests
 from functions_framework import http
-from flask import Request, jsonify
+from flask import Request, Response, jsonify
 
 from shared.observability import init_observability, traced_function
 from shared.correlation import with_correlation
@@ -15,6 +16,14 @@ logger, tracing = init_observability('discord-registrar', app=None)
 DISCORD_BOT_TOKEN = os.environ.get('DISCORD_BOT_TOKEN')
 DISCORD_APPLICATION_ID = os.environ.get('DISCORD_APPLICATION_ID')
 DISCORD_API_BASE_URL = "https://discord.com/api/v10"
+
+# Health payload only depends on static configuration, serialize it once
+_HEALTH_BODY = json.dumps({
+    'status': 'healthy',
+    'service': 'discord-registrar',
+    'configured': bool(DISCORD_BOT_TOKEN and DISCORD_APPLICATION_ID)
+})
+
 BASE_COMMANDS = [
     {
         "name": "hello",
@@ -244,11 +253,7 @@ def health_handler(request: Request):
     """Health check endpoint."""
     correlation_id = getattr(request, 'correlation_id', request.headers.get('X-Correlation-ID'))
     logger.info("Health check called", correlation_id=correlation_id)
-    return jsonify({
-        'status': 'healthy',
-        'service': 'discord-registrar',
-        'configured': bool(DISCORD_BOT_TOKEN and DISCORD_APPLICATION_ID)
-    }), 200
+    return Response(_HEALTH_BODY, 200, mimetype='application/json')
 
 
 @traced_function("register_all_commands")
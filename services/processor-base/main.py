@@ -1,13 +1,13 @@
 """Cloud Functions service that processes Pub/Sub messages for base Discord commands.
 Uses Functions Framework for Cloud Functions Gen2
 """
-import json
+import orjson
 import base64
 from functions_framework import cloud_event
 from cloudevents.http import CloudEvent
 
 from shared.observability import init_observability, traced_function
-from shared.processor_utils import process_interaction
+from shared.processor_utils import process_interaction, flush_user_usage
 from shared.pubsub_handler import handle_processor_response
 from command_registry import CommandHandler
 
@@ -51,8 +51,7 @@ def processor_base_handler(cloud_event: CloudEvent):
         try:
             if isinstance(message_data.get('message', {}).get('data'), str):
                 encoded_data = message_data['message']['data']
-                decoded_data = base64.b64decode(encoded_data).decode('utf-8')
-                interaction_data = json.loads(decoded_data)
+                interaction_data = orjson.loads(base64.b64decode(encoded_data))
                 logger.debug(
                     "Decoded base64 Pub/Sub message",
                     message_size_bytes=len(encoded_data)
@@ -61,7 +60,7 @@ def processor_base_handler(cloud_event: CloudEvent):
                 # --- If data is already decoded ---
                 interaction_data = message_data
                 logger.debug("Using already decoded Pub/Sub message")
-        except (ValueError, TypeError, json.JSONDecodeError, KeyError) as e:
+        except (ValueError, TypeError, orjson.JSONDecodeError, KeyError) as e:
             logger.error(
                 "Error decoding Pub/Sub message",
                 error=e,
@@ -130,3 +129,6 @@ def processor_base_handler(cloud_event: CloudEvent):
     except Exception as e:
         logger.error("Critical error in processor_base_handler", error=e, correlation_id=correlation_id)
         raise
+    finally:
+        # Send queued usage increments while the invocation still has CPU
+        flush_user_usage(correlation_id, logger)
@@ -1,6 +1,5 @@
 """Registry for Discord command handlers."""
 import inspect
-import traceback
 import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -19,7 +18,9 @@ class CommandHandler:
     def register(cls, command_name: str):
         """Decorator to register a command handler."""
         def decorator(func):
-            cls.HANDLERS[command_name] = func
+            # Resolve once whether the handler takes interaction_data
+            takes_data = len(inspect.signature(func).parameters) > 0
+            cls.HANDLERS[command_name] = (func, takes_data)
             return func
         return decorator
 
@@ -34,23 +35,20 @@ class CommandHandler:
         Returns:
             Discord interaction response dict
         """
-        handler = cls.HANDLERS.get(command_name)
-        if handler:
+        entry = cls.HANDLERS.get(command_name)
+        if entry:
+            handler, takes_data = entry
             try:
-                sig = inspect.signature(handler)
-                if len(sig.parameters) > 0:
+                if takes_data:
                     return handler(interaction_data)
-                else:
-                    return handler()
+                return handler()
             except Exception as e:
                 correlation_id = interaction_data.get('correlation_id') if interaction_data else None
-                error_traceback = traceback.format_exc()
                 logger.error(
                     "Error in command handler",
                     error=e,
                     error_type=type(e).__name__,
                     error_message=str(e),
-                    traceback=error_traceback,
                     command_name=command_name,
                     correlation_id=correlation_id
                 )
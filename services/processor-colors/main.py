@@ -1,11 +1,11 @@
 """Cloud Functions service that processes Pub/Sub messages for colors command."""
-import json
+import orjson
 import base64
 from functions_framework import cloud_event
 from cloudevents.http import CloudEvent
 
 from shared.observability import init_observability, traced_function
-from shared.processor_utils import process_interaction
+from shared.processor_utils import process_interaction, flush_user_usage
 from shared.pubsub_handler import handle_processor_response
 from command_registry import CommandHandler
 
@@ -32,11 +32,10 @@ def processor_colors_handler(cloud_event: CloudEvent):
         try:
             if isinstance(message_data.get('message', {}).get('data'), str):
                 encoded_data = message_data['message']['data']
-                decoded_data = base64.b64decode(encoded_data).decode('utf-8')
-                interaction_data = json.loads(decoded_data)
+                interaction_data = orjson.loads(base64.b64decode(encoded_data))
             else:
                 interaction_data = message_data
-        except (ValueError, TypeError, json.JSONDecodeError, KeyError) as e:
+        except (ValueError, TypeError, orjson.JSONDecodeError, KeyError) as e:
             logger.error("Error decoding Pub/Sub message", error=e, event_id=event_id)
             return
 
@@ -74,4 +73,7 @@ def processor_colors_handler(cloud_event: CloudEvent):
     except Exception as e:
         logger.error("Critical error in processor_colors_handler", error=e, correlation_id=correlation_id)
         raise
+    finally:
+        # Send queued usage increments while the invocation still has CPU
+        flush_user_usage(correlation_id, logger)
 
@@ -1,8 +1,16 @@
 """Cloud-agnostic logging and tracing with OpenTelemetry."""
 import os
+import atexit
 import logging
+import logging.handlers
 import json
+import queue
+import random
+import threading
+import time
+import traceback
 import uuid
+from contextvars import ContextVar
 from typing import Optional, Dict, Any
 from datetime import datetime, timezone
 from functools import wraps
@@ -15,6 +23,124 @@ from opentelemetry.sdk.resources import Resource
 from opentelemetry.instrumentation.flask import FlaskInstrumentor
 from opentelemetry.instrumentation.requests import RequestsInstrumentor
 
+# Correlation ID of the request being handled by the current thread/context.
+# Set by shared.correlation.with_correlation; log entries fall back to it.
+CORRELATION_ID: ContextVar[Optional[str]] = ContextVar('correlation_id', default=None)
+
+# Head-based sampling decision for the current request. When False,
+# traced_function calls the wrapped function without creating a span.
+TRACE_SAMPLED: ContextVar[bool] = ContextVar('trace_sampled', default=True)
+
+# Log records are formatted and written by one background listener per process,
+# so request threads only build the entry dict and enqueue it.
+_LOG_ASYNC = os.getenv('LOG_ASYNC', 'true').lower() != 'false'
+# Bound on queued records; past it records are dropped (and counted) rather
+# than letting memory grow while stdout is stalled.
+LOG_QUEUE_MAX = int(os.getenv('LOG_QUEUE_MAX', '10000'))
+# Fraction of DEBUG entries kept when DEBUG is enabled (1.0 keeps all)
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '1.0'))
+_log_queue = None
+_log_listener = None
+_dropped_log_records = 0
+_dropped_log_lock = threading.Lock()
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves formatting to the listener thread."""
+
+    def prepare(self, record):
+        # Snapshot the entry: the caller may reuse or mutate its dict while
+        # the listener thread is serializing it
+        if isinstance(record.msg, dict):
+            record.msg = dict(record.msg)
+        return record
+
+    def enqueue(self, record):
+        global _dropped_log_records
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with _dropped_log_lock:
+                _dropped_log_records += 1
+            return
+
+        if _dropped_log_records:
+            # Report drops once the writer has caught up
+            with _dropped_log_lock:
+                dropped, _dropped_log_records = _dropped_log_records, 0
+            if not dropped:
+                return
+            try:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    'name': record.name,
+                    'levelno': logging.WARNING,
+                    'levelname': 'WARNING',
+                    'msg': {
+                        "timestamp": datetime.now(timezone.utc).isoformat() + "Z",
+                        "severity": "WARNING",
+                        "message": "Log records dropped, log queue full",
+                        "dropped": dropped,
+                    },
+                }))
+            except queue.Full:
+                with _dropped_log_lock:
+                    _dropped_log_records += dropped
+
+
+def _get_log_queue_handler() -> logging.Handler:
+    """Return a handler feeding the shared background log writer."""
+    global _log_queue, _log_listener
+    if _log_listener is None:
+        _log_queue = queue.Queue(maxsize=LOG_QUEUE_MAX)
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(JsonFormatter())
+        _log_listener = logging.handlers.QueueListener(_log_queue, stream_handler)
+        _log_listener.start()
+        atexit.register(_log_listener.stop)
+    return _DeferredQueueHandler(_log_queue)
+
+
+# Tracebacks are rendered lazily, when the entry is serialized on the log
+# writer thread, and capped per second so failure storms stay cheap.
+LOG_TRACEBACKS_PER_SECOND = int(os.getenv('LOG_TRACEBACKS_PER_SECOND', '10'))
+_traceback_window = [0, 0]  # [second, tracebacks logged in that second]
+_traceback_lock = threading.Lock()
+
+
+def _traceback_allowed() -> bool:
+    """Return True while the per-second traceback budget is not exhausted."""
+    now = int(time.monotonic())
+    with _traceback_lock:
+        if _traceback_window[0] != now:
+            _traceback_window[0] = now
+            _traceback_window[1] = 0
+        _traceback_window[1] += 1
+        return _traceback_window[1] <= LOG_TRACEBACKS_PER_SECOND
+
+
+class _LazyTraceback:
+    """Exception traceback formatted only when the log entry is serialized."""
+
+    __slots__ = ('error',)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+    def __str__(self):
+        return ''.join(traceback.format_exception(type(self.error), self.error, self.error.__traceback__))
+
+
+def _error_details(error) -> Dict[str, Any]:
+    """Build the error block of a log entry."""
+    details = {
+        "type": type(error).__name__,
+        "message": str(error)
+    }
+    if isinstance(error, BaseException) and error.__traceback__ is not None and _traceback_allowed():
+        details["stacktrace"] = _LazyTraceback(error)
+    return details
+
+
 class StructuredLogger:
     """Cloud-agnostic structured logger with JSON output."""
 
@@ -25,11 +151,14 @@ class StructuredLogger:
     def _setup_logger(self):
         """Configure structured JSON logger."""
         logger = logging.getLogger(self.service_name)
-        logger.setLevel(logging.INFO)
+        logger.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
         logger.handlers = []
 
-        handler = logging.StreamHandler()
-        handler.setFormatter(JsonFormatter())
+        if _LOG_ASYNC:
+            handler = _get_log_queue_handler()
+        else:
+            handler = logging.StreamHandler()
+            handler.setFormatter(JsonFormatter())
         logger.addHandler(handler)
 
         return logger
@@ -58,6 +187,8 @@ class StructuredLogger:
         if trace_context:
             entry.update(trace_context)
 
+        if correlation_id is None:
+            correlation_id = CORRELATION_ID.get()
         if correlation_id:
             entry["correlation_id"] = correlation_id
 
@@ -66,37 +197,33 @@ class StructuredLogger:
 
     def info(self, message: str, **kwargs):
         """Log INFO level."""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         entry = self._build_log_entry(message, "INFO", **kwargs)
-        self.logger.info(json.dumps(entry))
+        self.logger.info(entry)
 
     def warning(self, message: str, error: Optional[Exception] = None, **kwargs):
         """Log WARNING level with optional exception details."""
         if error:
-            import traceback
-            kwargs["error"] = {
-                "type": type(error).__name__,
-                "message": str(error),
-                "stacktrace": traceback.format_exc()
-            }
+            kwargs["error"] = _error_details(error)
         entry = self._build_log_entry(message, "WARNING", **kwargs)
-        self.logger.warning(json.dumps(entry))
+        self.logger.warning(entry)
 
     def error(self, message: str, error: Optional[Exception] = None, **kwargs):
         """Log ERROR level with exception details."""
         if error:
-            import traceback
-            kwargs["error"] = {
-                "type": type(error).__name__,
-                "message": str(error),
-                "stacktrace": traceback.format_exc()
-            }
+            kwargs["error"] = _error_details(error)
         entry = self._build_log_entry(message, "ERROR", **kwargs)
-        self.logger.error(json.dumps(entry))
+        self.logger.error(entry)
 
     def debug(self, message: str, **kwargs):
         """Log DEBUG level."""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        if LOG_DEBUG_SAMPLE_RATE < 1.0 and random.random() >= LOG_DEBUG_SAMPLE_RATE:
+            return
         entry = self._build_log_entry(message, "DEBUG", **kwargs)
-        self.logger.debug(json.dumps(entry))
+        self.logger.debug(entry)
 
 
 class JsonFormatter(logging.Formatter):
@@ -104,6 +231,8 @@ class JsonFormatter(logging.Formatter):
 
     def format(self, record):
         """Format log record as JSON if not already formatted."""
+        if isinstance(record.msg, dict):
+            return json.dumps(record.msg, default=str)
         if isinstance(record.msg, str) and record.msg.startswith('{'):
             return record.msg
 
@@ -198,6 +327,8 @@ def init_observability(service_name: str, app=None, environment: str = None):
 def traced_function(operation_name: Optional[str] = None):
     """Decorator to trace a function with OpenTelemetry.
 
+    No span is created when the request was not sampled (see TRACE_SAMPLED).
+
     Usage:
         @traced_function("my_operation")
         def my_function():
@@ -206,6 +337,9 @@ def traced_function(operation_name: Optional[str] = None):
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            if not TRACE_SAMPLED.get():
+                return func(*args, **kwargs)
+
             tracer = trace.get_tracer(__name__)
             op_name = operation_name or func.__name__
 
@@ -0,0 +1,19 @@
+"""Process-wide Firestore client."""
+import os
+
+from google.cloud import firestore
+
+FIRESTORE_DATABASE = os.getenv('FIRESTORE_DATABASE', 'guidon-db')
+
+# Created at import (cold start) so the first request does not pay client
+# and gRPC channel setup; every module of the process shares this instance
+_db_client = firestore.Client(database=FIRESTORE_DATABASE)
+
+
+def get_db() -> firestore.Client:
+    """Get the Firestore client shared by every module of the process.
+
+    Returns:
+        firestore.Client for FIRESTORE_DATABASE
+    """
+    return _db_client
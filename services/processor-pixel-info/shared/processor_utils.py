@@ -1,11 +1,109 @@
 """Shared utilities for processor services."""
 import os
+import json
+import time
+import queue
+import atexit
+import base64
+import hashlib
+import threading
 import requests
-from typing import Optional, Dict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, Tuple
+from urllib.parse import urlparse
+from google.oauth2 import id_token
+from google.auth.transport import requests as google_requests
+
+# --- Outbound HTTP ---
+# Keep-alive pool shared by every webhook/user-manager call of this instance.
+# Only connection failures are retried: a POST that reached Discord must not
+# be replayed and post the response twice.
+_http_session = requests.Session()
+_http_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.1)
+)
+_http_session.mount('https://', _http_adapter)
+_http_session.mount('http://', _http_adapter)
+
+# --- Command response cache ---
+# Commands whose response only depends on the command name and its options.
+# Defaults to static commands; data-dependent ones (e.g. leaderboard) must be
+# opted in explicitly since they are served stale for up to COMMAND_CACHE_TTL.
+CACHEABLE_COMMANDS = frozenset(
+    name.strip()
+    for name in os.environ.get('CACHEABLE_COMMANDS', 'colors,help').split(',')
+    if name.strip()
+)
+COMMAND_CACHE_TTL = float(os.environ.get('COMMAND_CACHE_TTL', '30'))
+COMMAND_CACHE_MAX_ENTRIES = 256
+
+_command_cache: Dict[str, Tuple[dict, float]] = {}
+_command_cache_lock = threading.Lock()
+
+def _command_cache_key(command_name: str, interaction: dict) -> str:
+    """Build the response cache key from the command name and its options."""
+    options = interaction.get('data', {}).get('options', [])
+    raw = json.dumps({'c': command_name, 'a': options}, sort_keys=True, separators=(',', ':'))
+    return 'cmd:' + hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def get_cached_command_response(key: str) -> Optional[dict]:
+    """Get a cached command response if it has not expired."""
+    with _command_cache_lock:
+        entry = _command_cache.get(key)
+        if entry is None:
+            return None
+        response, expires = entry
+        if time.monotonic() < expires:
+            return response
+        del _command_cache[key]
+    return None
+
+
+def cache_command_response(key: str, response: dict):
+    """Cache a command response for COMMAND_CACHE_TTL seconds."""
+    with _command_cache_lock:
+        _command_cache[key] = (response, time.monotonic() + COMMAND_CACHE_TTL)
+        while len(_command_cache) > COMMAND_CACHE_MAX_ENTRIES:
+            del _command_cache[next(iter(_command_cache))]
+
+
+# --- Identity token cache ---
+# ID tokens are valid for an hour: reuse them per audience and refresh five
+# minutes before the exp claim instead of hitting the metadata server per call.
+_TOKEN_REFRESH_MARGIN = 300
+_token_cache: Dict[str, Tuple[str, float]] = {}
+_token_cache_lock = threading.Lock()
+
+
+def _token_refresh_at(token: str) -> float:
+    """Return the time after which a cached ID token must be refetched.
+
+    The token comes straight from the metadata server, so the payload is read
+    without verifying the signature.
+
+    Args:
+        token: Encoded JWT identity token
+
+    Returns:
+        Unix timestamp (exp claim minus the refresh margin), 0 if unreadable
+    """
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return float(claims['exp']) - _TOKEN_REFRESH_MARGIN
+    except (IndexError, KeyError, TypeError, ValueError):
+        return 0.0
+
 
 def get_auth_token(audience: str, logger=None) -> Optional[str]:
     """Get Google Cloud identity token for service-to-service authentication.
 
+    Tokens are cached per audience until five minutes before they expire.
+
     Args:
         audience: The target service URL (audience for the token)
         logger: Optional logger instance for error logging
@@ -19,22 +117,25 @@ def get_auth_token(audience: str, logger=None) -> Optional[str]:
         return None
 
     try:
-        from urllib.parse import urlparse
-        from google.oauth2 import id_token
-        from google.auth.transport import requests as google_requests
-
         parsed = urlparse(audience)
         normalized_audience = f"{parsed.scheme}://{parsed.netloc}"
 
+        with _token_cache_lock:
+            cached = _token_cache.get(normalized_audience)
+        if cached and time.time() < cached[1]:
+            return cached[0]
+
         if logger:
             logger.debug(
-                "Normalizing audience for identity token",
+                "Fetching identity token",
                 original_audience=audience,
                 normalized_audience=normalized_audience
             )
 
         request_session = google_requests.Request()
         token = id_token.fetch_id_token(request_session, normalized_audience)
+        with _token_cache_lock:
+            _token_cache[normalized_audience] = (token, _token_refresh_at(token))
         return token
     except Exception as e:
         if logger:
@@ -64,9 +165,6 @@ def verify_auth_token(request, expected_audience: str = None, logger=None) -> tu
     token = auth_header[7:]  # Remove 'Bearer ' prefix
 
     try:
-        from google.oauth2 import id_token
-        from google.auth.transport import requests as google_requests
-
         request_session = google_requests.Request()
 
         # Verify token
@@ -166,7 +264,7 @@ def send_discord_webhook_direct(
         return False
 
     try:
-        result = requests.post(url, headers=headers, json=payload, timeout=10)
+        result = _http_session.post(url, headers=headers, json=payload, timeout=10)
         if result.status_code in [200, 204]:
             if logger:
                 logger.info(
@@ -213,7 +311,7 @@ def send_web_webhook(
         return False
 
     try:
-        result = requests.post(webhook_url, json=response, timeout=10)
+        result = _http_session.post(webhook_url, json=response, timeout=10)
         if result.status_code in [200, 201, 204]:
             if logger:
                 logger.info("Response sent directly to web webhook", correlation_id=correlation_id)
@@ -232,52 +330,74 @@ def send_web_webhook(
             logger.error("Exception sending to web webhook", error=e, correlation_id=correlation_id)
         return False
 
-def increment_user_usage_async(
-    user_id: str,
-    command: str,
-    correlation_id: Optional[str] = None,
-    logger=None
-):
-    """Increment user usage counter asynchronously (non-blocking).
+# --- Usage increment batching ---
+# Increments are queued during the invocation and sent to the bulk endpoint by
+# flush_user_usage() before the handler returns: Cloud Functions Gen2 throttles
+# CPU once the invocation ends, so a background flusher would not run reliably.
+# Concurrent invocations on one instance share the queue, so a flush carries
+# every increment queued so far.
+USAGE_FLUSH_MAX_ITEMS = 200
+_usage_queue: "queue.Queue[Tuple[str, str]]" = queue.Queue(maxsize=10000)
+_usage_drain_lock = threading.Lock()
+_usage_drain_registered = False
 
-    Args:
-        user_id: Discord user ID
-        command: Command name
-        correlation_id: Optional correlation ID for logging
-        logger: Logger instance (optional)
-    """
+
+def _user_manager_base_url() -> Optional[str]:
+    """Return USER_MANAGER_URL normalized to an https origin, or None."""
     user_manager_url = os.environ.get('USER_MANAGER_URL')
     if not user_manager_url:
-        return
+        return None
 
     user_manager_url = user_manager_url.rstrip('/')
     if not user_manager_url.startswith('http://') and not user_manager_url.startswith('https://'):
         user_manager_url = f"https://{user_manager_url}"
     elif user_manager_url.startswith('http://'):
         user_manager_url = user_manager_url.replace('http://', 'https://', 1)
+    return user_manager_url
 
-    headers = get_authenticated_headers(user_manager_url, correlation_id, logger)
-    headers['Content-Type'] = 'application/json'
+
+def _send_usage_increments(batch: list, correlation_id: Optional[str] = None, logger=None):
+    """POST aggregated usage increments to the user-manager bulk endpoint.
+
+    Args:
+        batch: List of (user_id, command) tuples
+        correlation_id: Optional correlation ID for logging
+        logger: Logger instance (optional)
+    """
+    user_manager_url = _user_manager_base_url()
+    if not user_manager_url or not batch:
+        return
+
+    counts: Dict[Tuple[str, str], int] = {}
+    for key in batch:
+        counts[key] = counts.get(key, 0) + 1
+    increments = [
+        {'user_id': user_id, 'command': command, 'count': count}
+        for (user_id, command), count in counts.items()
+    ]
 
     try:
-        response = requests.post(
-            f"{user_manager_url}/api/users/{user_id}/increment",
-            json={'command': command},
+        # Token/metadata-server failures are handled like request failures
+        headers = get_authenticated_headers(user_manager_url, correlation_id, logger)
+        headers['Content-Type'] = 'application/json'
+        response = _http_session.post(
+            f"{user_manager_url}/api/users/increment-bulk",
+            json={'increments': increments},
             headers=headers,
-            timeout=2
+            timeout=5
         )
         if response.status_code == 200 and logger:
             logger.debug(
                 "User usage incremented",
                 correlation_id=correlation_id,
-                user_id=user_id,
-                command=command
+                increments=len(batch),
+                users=len(increments)
             )
         elif response.status_code != 200 and logger:
             logger.warning(
                 "Failed to increment user usage",
                 correlation_id=correlation_id,
-                user_id=user_id,
+                increments=len(batch),
                 status_code=response.status_code,
                 response_text=response.text[:200]
             )
@@ -288,10 +408,72 @@ def increment_user_usage_async(
                 "Failed to increment user usage (non-blocking)",
                 error=e,
                 correlation_id=correlation_id,
-                user_id=user_id
+                increments=len(batch)
             )
 
 
+def flush_user_usage(correlation_id: Optional[str] = None, logger=None):
+    """Send every queued usage increment, in bulk requests.
+
+    Processors call this before returning so the increments are sent while
+    the invocation still has CPU. Never raises.
+
+    Args:
+        correlation_id: Optional correlation ID for logging
+        logger: Logger instance (optional)
+    """
+    while True:
+        batch = []
+        while len(batch) < USAGE_FLUSH_MAX_ITEMS:
+            try:
+                batch.append(_usage_queue.get_nowait())
+            except queue.Empty:
+                break
+        if not batch:
+            return
+        _send_usage_increments(batch, correlation_id, logger)
+
+
+def _register_usage_drain(logger=None):
+    """Flush leftovers at interpreter exit (best effort, not run on SIGKILL)."""
+    global _usage_drain_registered
+    if _usage_drain_registered:
+        return
+    with _usage_drain_lock:
+        if _usage_drain_registered:
+            return
+        atexit.register(flush_user_usage, None, logger)
+        _usage_drain_registered = True
+
+
+def increment_user_usage_async(
+    user_id: str,
+    command: str,
+    correlation_id: Optional[str] = None,
+    logger=None
+):
+    """Increment user usage counter asynchronously (non-blocking).
+
+    The increment is queued and sent with others in one bulk request by
+    flush_user_usage(), which the caller's entry point must invoke before
+    returning; if the queue is full it is sent synchronously instead.
+
+    Args:
+        user_id: Discord user ID
+        command: Command name
+        correlation_id: Optional correlation ID for logging
+        logger: Logger instance (optional)
+    """
+    if not os.environ.get('USER_MANAGER_URL'):
+        return
+
+    _register_usage_drain(logger)
+    try:
+        _usage_queue.put_nowait((user_id, command))
+    except queue.Full:
+        _send_usage_increments([(user_id, command)], correlation_id, logger)
+
+
 def process_interaction(
     interaction: dict,
     command_handler,
@@ -326,10 +508,26 @@ def process_interaction(
 
             if logger:
                 logger.info("Processing command", correlation_id=correlation_id, command_name=command_name)
-            interaction_with_context = interaction.copy()
-            if correlation_id:
-                interaction_with_context['correlation_id'] = correlation_id
-            response = command_handler.handle(command_name, interaction_with_context)
+            cache_key = None
+            response = None
+            if COMMAND_CACHE_TTL > 0 and command_name in CACHEABLE_COMMANDS:
+                cache_key = _command_cache_key(command_name, interaction)
+                response = get_cached_command_response(cache_key)
+                if logger:
+                    logger.debug(
+                        "Command response cache hit" if response is not None else "Command response cache miss",
+                        correlation_id=correlation_id,
+                        command_name=command_name,
+                        cache_hit=response is not None
+                    )
+
+            if response is None:
+                interaction_with_context = interaction.copy()
+                if correlation_id:
+                    interaction_with_context['correlation_id'] = correlation_id
+                response = command_handler.handle(command_name, interaction_with_context)
+                if cache_key and response:
+                    cache_command_response(cache_key, response)
             read_only_commands = {
                 'stats', 'leaderboard', 'canvas-state', 'snapshot',
                 'colors', 'pixel-info', 'hello', 'ping', 'help', 'userinfo'
@@ -19,6 +19,7 @@ from shared.embed_utils import (
 )
 from shared.canvas_client import CanvasClient
 from shared.user_client import UserManagementClient
+from shared.processor_utils import increment_user_usage_async
 
 logger, _ = init_observability('processor-snapshot-handler', app=None)
 
@@ -72,10 +73,8 @@ def handle_snapshot(interaction: dict = None):
     if not result.get('success'):
         return create_error_embed("Snapshot failed", result.get('error', 'Could not generate the snapshot.'))
 
-    try:
-        user_client.increment_usage(user_id, 'snapshot', correlation_id=correlation_id)
-    except Exception as exc:
-        logger.warning("Failed to increment snapshot usage", error=exc, correlation_id=correlation_id, user_id=user_id)
+    # Queued and flushed in bulk: the response does not depend on the counter
+    increment_user_usage_async(user_id, 'snapshot', correlation_id=correlation_id, logger=logger)
 
     snapshot_url = result.get('public_url')
     fields = [{
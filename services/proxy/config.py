@@ -8,6 +8,34 @@ DISCORD_APPLICATION_ID = os.environ.get('DISCORD_APPLICATION_ID')
 DISCORD_API_BASE_URL = "https://discord.com/api/v10"
 AUTH_SERVICE_URL = os.environ.get('AUTH_SERVICE_URL', '').rstrip('/')
 
+# Largest web interaction body accepted before it is buffered and parsed
+MAX_WEB_INTERACTION_BYTES = int(os.environ.get('MAX_WEB_INTERACTION_BYTES', str(64 * 1024)))
+
+# Log one health probe out of every HEALTH_LOG_EVERY (1 = log all, 0 = never)
+HEALTH_LOG_EVERY = int(os.environ.get('HEALTH_LOG_EVERY', '100'))
+
+# Log one success-path info entry out of every LOG_SAMPLE_RATE (warnings/errors are never sampled)
+LOG_SAMPLE_RATE = max(1, int(os.environ.get('LOG_SAMPLE_RATE', '50')))
+
+# Verified web session cache (positive and negative results)
+SESSION_CACHE_TTL = float(os.environ.get('SESSION_CACHE_TTL', '60'))
+SESSION_CACHE_NEGATIVE_TTL = float(os.environ.get('SESSION_CACHE_NEGATIVE_TTL', '5'))
+SESSION_CACHE_MAX_ENTRIES = int(os.environ.get('SESSION_CACHE_MAX_ENTRIES', '10000'))
+
+# Publisher batching: one message per proxy request, so by default each
+# message is sent as soon as it is published instead of waiting for a batch
+PUBSUB_BATCH_MAX_MESSAGES = int(os.environ.get('PUBSUB_BATCH_MAX_MESSAGES', '1'))
+PUBSUB_BATCH_MAX_LATENCY = float(os.environ.get('PUBSUB_BATCH_MAX_LATENCY', '0.01'))
+
+# Seconds a web interaction waits for its publish to be acknowledged before
+# answering 503
+WEB_PUBLISH_TIMEOUT = float(os.environ.get('WEB_PUBLISH_TIMEOUT', '5'))
+# Same for Discord interactions, kept well inside Discord's 3 second deadline
+DISCORD_PUBLISH_TIMEOUT = float(os.environ.get('DISCORD_PUBLISH_TIMEOUT', '1.5'))
+
+# Seconds to spend connecting the publisher channel at cold start (0 disables)
+PUBSUB_WARMUP_TIMEOUT = float(os.environ.get('PUBSUB_WARMUP_TIMEOUT', '10'))
+
 PUBSUB_TOPIC_INTERACTIONS = os.environ.get(
     'PUBSUB_TOPIC_INTERACTIONS', 'interactions'
 )
@@ -15,3 +43,14 @@ PUBSUB_TOPIC_COMMANDS_BASE = os.environ.get(
     'PUBSUB_TOPIC_COMMANDS_BASE', 'commands-base'
 )
 
+# Command -> Pub/Sub topic routing for the processor microservices.
+# Commands missing from this map go to PUBSUB_TOPIC_COMMANDS_BASE.
+COMMAND_TOPIC_MAP = {
+    'draw': os.environ.get('PUBSUB_TOPIC_COMMANDS_DRAW', 'commands-draw'),
+    'snapshot': os.environ.get('PUBSUB_TOPIC_COMMANDS_SNAPSHOT', 'commands-snapshot'),
+    'canvas_state': os.environ.get('PUBSUB_TOPIC_COMMANDS_CANVAS_STATE', 'commands-canvas-state'),
+    'stats': os.environ.get('PUBSUB_TOPIC_COMMANDS_STATS', 'commands-stats'),
+    'colors': os.environ.get('PUBSUB_TOPIC_COMMANDS_COLORS', 'commands-colors'),
+    'pixel_info': os.environ.get('PUBSUB_TOPIC_COMMANDS_PIXEL_INFO', 'commands-pixel-info'),
+    'getpixel': os.environ.get('PUBSUB_TOPIC_COMMANDS_PIXEL_INFO', 'commands-pixel-info'),
+}
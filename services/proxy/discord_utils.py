@@ -1,6 +1,6 @@
 """Discord-specific utilities (signature verification)."""
-from nacl.signing import VerifyKey
-from nacl.exceptions import BadSignatureError
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
 import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -12,17 +12,40 @@ from config import DISCORD_PUBLIC_KEY  # noqa: E402
 logger, _ = init_observability('discord-proxy-utils', app=None)
 
 
+def _load_verify_key():
+    """Decode the Discord application public key once per instance."""
+    if not DISCORD_PUBLIC_KEY:
+        return None
+
+    try:
+        return Ed25519PublicKey.from_public_bytes(bytes.fromhex(DISCORD_PUBLIC_KEY))
+    except ValueError as e:
+        logger.error("Invalid DISCORD_PUBLIC_KEY", error=e)
+        return None
+
+
+_VERIFY_KEY = _load_verify_key()
+
+# Ed25519 signatures are 64 bytes, i.e. 128 hex characters
+_SIGNATURE_HEX_LENGTH = 128
+
+
 def verify_discord_signature(signature: str, timestamp: str, body: bytes) -> bool:
     """Verify Discord request signature."""
-    if not DISCORD_PUBLIC_KEY:
+    if _VERIFY_KEY is None:
         logger.warning("DISCORD_PUBLIC_KEY not configured")
         return False
 
+    if len(signature) != _SIGNATURE_HEX_LENGTH:
+        logger.warning("Signature verification failed", error="malformed signature length")
+        return False
+
     try:
-        verify_key = VerifyKey(bytes.fromhex(DISCORD_PUBLIC_KEY))
-        message = timestamp.encode() + body
-        verify_key.verify(message, bytes.fromhex(signature))
+        signature_bytes = bytes.fromhex(signature)
+        # Discord timestamps are ASCII digits; non-ASCII input fails as ValueError
+        message = timestamp.encode('ascii') + body
+        _VERIFY_KEY.verify(signature_bytes, message)
         return True
-    except (BadSignatureError, ValueError) as e:
+    except (InvalidSignature, ValueError) as e:
         logger.warning("Signature verification failed", error=e)
         return False
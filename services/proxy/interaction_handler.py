@@ -1,19 +1,13 @@
 """Interaction processing logic."""
-import os
 from command_handler import handle_simple_command
-from response_utils import get_proxy_url
-from user_integration import (
-    get_user_id_from_interaction,
-    check_user_allowed,
-    get_rate_limit_error_response,
-    is_user_registered
-)
+from config import DISCORD_BOT_TOKEN
+from user_integration import get_user_id_from_interaction, is_user_registered
 from shared.observability import init_observability
 
 logger, _ = init_observability('discord-proxy', app=None)
 
 # - Commands that don't require registration -
-NO_REGISTRATION_REQUIRED = {'register', 'help', 'ping', 'hello'}
+NO_REGISTRATION_REQUIRED = frozenset({'register', 'help', 'ping', 'hello'})
 
 
 def process_interaction(
@@ -31,9 +25,7 @@ def process_interaction(
     Returns:
         Tuple of (response_dict, status_code) or None if needs Pub/Sub
     """
-    if interaction_type == 'discord' and interaction_data.get('type') == 1:
-        return {'type': 1}, 200
-
+    # Discord PINGs are answered in main.discord_interactions before dispatch
     if interaction_type == 'discord':
         if interaction_data.get('type') != 2:
             return None
@@ -44,28 +36,6 @@ def process_interaction(
     if not command_name:
         return None
 
-    user_payload = None
-    if interaction_type == 'discord':
-        member = interaction_data.get('member', {})
-        user = member.get('user') or interaction_data.get('user', {})
-        if user:
-            username = user.get('username', 'unknown')
-            discriminator = user.get('discriminator', '0')
-            full_username = f"{username}#{discriminator}" if discriminator != '0' else username
-            user_payload = {
-                'username': full_username,
-                'avatar': user.get('avatar')
-            }
-    else:  # web interaction
-        user_id_from_data = interaction_data.get('user_id') or interaction_data.get('user', {}).get('id')
-        if user_id_from_data:
-            user_data = interaction_data.get('user', {})
-            username = user_data.get('username') or interaction_data.get('username', 'web-user')
-            user_payload = {
-                'username': username,
-                'avatar': user_data.get('avatar') or interaction_data.get('avatar')
-            }
-
     user_id = get_user_id_from_interaction(interaction_data)
 
     if user_id and command_name not in NO_REGISTRATION_REQUIRED:
@@ -100,13 +70,11 @@ def prepare_pubsub_data(interaction_data: dict, interaction_type: str,
         interaction_type: 'discord' or 'web'
         signature: Discord signature (optional)
         timestamp: Discord timestamp (optional)
-        request: Functions Framework request object (optional)
+        request: Functions Framework request object (optional, unused)
 
     Returns:
         Dictionary ready for Pub/Sub
     """
-    proxy_url = get_proxy_url(request)
-
     if interaction_type == 'web':
         user_id = interaction_data.get('user_id') or interaction_data.get('user', {}).get('id')
         user_data = interaction_data.get('user', {})
@@ -145,7 +113,7 @@ def prepare_pubsub_data(interaction_data: dict, interaction_type: str,
     else:
         result = {
             'interaction': interaction_data,
-            'discord_bot_token': os.environ.get('DISCORD_BOT_TOKEN')
+            'discord_bot_token': DISCORD_BOT_TOKEN
         }
         if signature and timestamp:
             result['headers'] = {
@@ -6,31 +6,136 @@ Discord requires responses within 3 seconds. This service:
 - Uses deferred responses (type 5) for complex commands
 - Always responds within 3 seconds to Discord
 """
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from functions_framework import http
-from flask import Request, jsonify, make_response, Response
+from flask import Request, Response
 
 from shared.observability import init_observability, traced_function
 from config import (
     PROJECT_ID,
     PUBSUB_TOPIC_INTERACTIONS,
-    AUTH_SERVICE_URL
+    PUBSUB_TOPIC_COMMANDS_BASE,
+    AUTH_SERVICE_URL,
+    MAX_WEB_INTERACTION_BYTES,
+    HEALTH_LOG_EVERY,
+    LOG_SAMPLE_RATE,
+    SESSION_CACHE_TTL,
+    SESSION_CACHE_NEGATIVE_TTL,
+    SESSION_CACHE_MAX_ENTRIES,
+    WEB_PUBLISH_TIMEOUT,
+    DISCORD_PUBLISH_TIMEOUT
 )
 from discord_utils import verify_discord_signature
 from interaction_handler import process_interaction, prepare_pubsub_data
 from pubsub_utils import get_topic_for_command, publish_to_pubsub
-from response_utils import get_error_response
+from response_utils import get_error_response, json_response
 from shared.correlation import with_correlation
 
 logger, tracing = init_observability('discord-proxy', app=None)
 
+# Health payload only depends on static configuration, serialize it once
+_HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'service': 'discord-proxy',
+    'project_id': PROJECT_ID,
+    'topics': {
+        'interactions': PUBSUB_TOPIC_INTERACTIONS,
+        'commands_base': PUBSUB_TOPIC_COMMANDS_BASE
+    }
+})
+_health_probe_counter = itertools.count()
+_success_log_counter = itertools.count()
+
+# Discord acknowledgement bodies; a fresh Response is built per request so
+# per-request headers (X-Correlation-ID) never leak between responses
+_DEFERRED_BODY = orjson.dumps({'type': 5})
+_PONG_BODY = orjson.dumps({'type': 1})
+
+# Keep-alive connection pool to auth-service, reused across web interactions
+_VERIFY_URL = f"{AUTH_SERVICE_URL}/auth/verify"
+_AUTH_SESSION = requests.Session()
+if AUTH_SERVICE_URL:
+    _AUTH_SESSION.mount(
+        AUTH_SERVICE_URL.split('://', 1)[0] + '://',
+        HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=1,
+                backoff_factor=0.1,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=frozenset({'POST'}),
+                raise_on_status=False
+            )
+        )
+    )
+
+# Verified sessions keyed by a hash of the session id (raw tokens are never stored).
+# Values are (result, expires_at) where result is the _verify_web_session tuple.
+_AUTH_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+_AUTH_CACHE_LOCK = threading.RLock()
+# Verifications currently in progress, keyed like _AUTH_CACHE
+_AUTH_INFLIGHT: "dict[str, Future]" = {}
+# Two (1s connect, 5s read) auth-service attempts plus retry backoff
+AUTH_VERIFY_WAIT_SECONDS = 12.5
+
+
+def _session_cache_key(session_id: str) -> str:
+    """Hash a session id into its cache key."""
+    return hashlib.blake2b(session_id.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _get_cached_session(key: str):
+    """Return a cached verification result, or None if missing or expired."""
+    with _AUTH_CACHE_LOCK:
+        entry = _AUTH_CACHE.get(key)
+        if entry is None:
+            return None
+        result, expires_at = entry
+        if expires_at <= time.monotonic():
+            del _AUTH_CACHE[key]
+            return None
+        _AUTH_CACHE.move_to_end(key)
+        return result
+
+
+def _cache_session(key: str, result: tuple, ttl: float):
+    """Store a verification result for ttl seconds, evicting least recently used entries."""
+    if ttl <= 0:
+        return
+    with _AUTH_CACHE_LOCK:
+        _AUTH_CACHE[key] = (result, time.monotonic() + ttl)
+        _AUTH_CACHE.move_to_end(key)
+        while len(_AUTH_CACHE) > SESSION_CACHE_MAX_ENTRIES:
+            _AUTH_CACHE.popitem(last=False)
+
+
+_CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, X-Session-ID, X-Correlation-ID, Authorization',
+    'Access-Control-Max-Age': '3600'
+}
+
+
+def _sample_success_log() -> bool:
+    """Return True for one success-path log out of every LOG_SAMPLE_RATE."""
+    return next(_success_log_counter) % LOG_SAMPLE_RATE == 0
+
 
 def add_cors_headers(response):
     """Add CORS headers to response."""
-    response.headers['Access-Control-Allow-Origin'] = '*'
-    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, X-Session-ID, X-Correlation-ID, Authorization'
-    response.headers['Access-Control-Max-Age'] = '3600'
+    response.headers.update(_CORS_HEADERS)
     return response
 
 
@@ -47,49 +152,25 @@ def proxy_handler(request: Request):
 
     # Handle CORS preflight requests
     if method == 'OPTIONS':
-        response = make_response('', 200)
-        return add_cors_headers(response)
-
-    # --- Health check ---
-    if path == "/health" and method == "GET":
-        result = health_handler(request)
-        response = result if isinstance(result, Response) else make_response(result[0], result[1]) if isinstance(result, tuple) else result
-        return add_cors_headers(response)
-
-    # --- Web interactions endpoint ---
-    if path == "/web/interactions" and method == "POST":
-        result = web_interactions(request)
-        response = result if isinstance(result, Response) else make_response(result[0], result[1]) if isinstance(result, tuple) else result
-        return add_cors_headers(response)
-
-    # --- Discord interactions endpoint ---
-    if path == "/discord/interactions" and method == "POST":
-        return discord_interactions(request)
-
-    logger.warning("Unknown path", path=path, method=method)
-    response = jsonify({'error': 'Not found'}), 404
-    if isinstance(response, tuple):
-        response = make_response(response[0], response[1])
-    return add_cors_headers(response)
+        return Response(status=204, headers=_CORS_HEADERS)
+
+    route = _ROUTES.get((method, path))
+    if route is None:
+        logger.warning("Unknown path", path=path, method=method)
+        return add_cors_headers(json_response({'error': 'Not found'}, 404))
+
+    handler, with_cors = route
+    response = handler(request)
+    return add_cors_headers(response) if with_cors else response
+
 
 def health_handler(request: Request):
     """Health check endpoint."""
-    correlation_id = getattr(request, 'correlation_id', request.headers.get('X-Correlation-ID'))
-    logger.info("Health check called", correlation_id=correlation_id)
+    if HEALTH_LOG_EVERY > 0 and next(_health_probe_counter) % HEALTH_LOG_EVERY == 0:
+        correlation_id = getattr(request, 'correlation_id', request.headers.get('X-Correlation-ID'))
+        logger.info("Health check called", correlation_id=correlation_id, sampled_every=HEALTH_LOG_EVERY)
 
-    from config import (
-        PUBSUB_TOPIC_INTERACTIONS,
-        PUBSUB_TOPIC_COMMANDS_BASE
-    )
-    return jsonify({
-        'status': 'healthy',
-        'service': 'discord-proxy',
-        'project_id': PROJECT_ID,
-        'topics': {
-            'interactions': PUBSUB_TOPIC_INTERACTIONS,
-            'commands_base': PUBSUB_TOPIC_COMMANDS_BASE
-        }
-    }), 200
+    return Response(_HEALTH_BODY, 200, mimetype='application/json')
 
 
 @traced_function("web_interactions")
@@ -98,10 +179,31 @@ def web_interactions(request: Request):
     correlation_id = getattr(request, 'correlation_id', request.headers.get('X-Correlation-ID'))
 
     try:
+        content_length = request.content_length
+        if content_length and content_length > MAX_WEB_INTERACTION_BYTES:
+            logger.warning(
+                "Web interaction body too large",
+                correlation_id=correlation_id,
+                content_length=content_length,
+                max_bytes=MAX_WEB_INTERACTION_BYTES
+            )
+            return json_response({'status': 'error', 'message': 'Payload too large'}, 413)
+
+        # Chunked bodies have no Content-Length: read at most one byte past
+        # the limit instead of buffering whatever the client sends
+        body = request.stream.read(MAX_WEB_INTERACTION_BYTES + 1)
+        if len(body) > MAX_WEB_INTERACTION_BYTES:
+            logger.warning(
+                "Web interaction body too large",
+                correlation_id=correlation_id,
+                max_bytes=MAX_WEB_INTERACTION_BYTES
+            )
+            return json_response({'status': 'error', 'message': 'Payload too large'}, 413)
+
         session_id = _extract_session_id(request)
         if not session_id:
             logger.warning("Web interaction missing session", correlation_id=correlation_id)
-            return jsonify({'status': 'error', 'message': 'Missing session'}), 401
+            return json_response({'status': 'error', 'message': 'Missing session'}, 401)
 
         verified_user, status_code, error_message = _verify_web_session(session_id, correlation_id)
         if not verified_user:
@@ -111,60 +213,66 @@ def web_interactions(request: Request):
                 status_code=status_code,
                 error=error_message
             )
-            return jsonify({'status': 'error', 'message': error_message}), status_code
+            return json_response({'status': 'error', 'message': error_message}, status_code)
 
-        data = request.get_json(silent=True)
-        if not data:
+        try:
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            data = None
+        if not data or not isinstance(data, dict):
             logger.warning("Invalid JSON in web interaction", correlation_id=correlation_id)
-            return jsonify({'status': 'error', 'message': 'Invalid JSON'}), 400
+            return json_response({'status': 'error', 'message': 'Invalid JSON'}, 400)
 
         command_name = data.get('command')
         if not command_name:
             logger.warning("Missing command in web interaction", correlation_id=correlation_id)
-            return jsonify({'status': 'error', 'message': 'Missing command'}), 400
+            return json_response({'status': 'error', 'message': 'Missing command'}, 400)
 
-        logger.info("Processing web interaction", correlation_id=correlation_id, command=command_name)
+        logger.debug("Processing web interaction", correlation_id=correlation_id, command=command_name)
 
         _inject_verified_user(data, verified_user)
 
         result = process_interaction(data, 'web', correlation_id=correlation_id)
         if result:
             response, status_code = result
-            logger.info("Web interaction processed immediately", correlation_id=correlation_id, status_code=status_code)
-            return jsonify(response), status_code
+            if _sample_success_log():
+                logger.info("Web interaction processed immediately", correlation_id=correlation_id, status_code=status_code)
+            return json_response(response, status_code)
 
         pubsub_data = prepare_pubsub_data(data, 'web', request=request)
         
         if not pubsub_data:
             logger.warning("Failed to prepare pubsub data (missing webhook_url?)", correlation_id=correlation_id)
-            return jsonify({'status': 'error', 'message': 'Invalid interaction data'}), 400
+            return json_response({'status': 'error', 'message': 'Invalid interaction data'}, 400)
 
         pubsub_data['correlation_id'] = correlation_id  # Propagate correlation ID
         topic = get_topic_for_command(command_name)
 
         try:
-            message_id = publish_to_pubsub(topic, pubsub_data, logger=logger, correlation_id=correlation_id)
-            logger.info(
-                "Published web interaction to Pub/Sub",
-                correlation_id=correlation_id,
-                topic=topic,
-                command=command_name,
-                message_id=message_id
-            )
-            return jsonify({
+            # Web clients wait for the webhook result, so a lost publish must
+            # be reported now rather than only logged from the callback
+            publish_to_pubsub(
+                topic,
+                pubsub_data,
+                logger=logger,
+                log_success=_sample_success_log(),
+                interaction_type='web',
+                command_name=command_name
+            ).result(timeout=WEB_PUBLISH_TIMEOUT)
+            return json_response({
                 'status': 'processing',
                 'message': 'Command is being processed',
                 'command': command_name
-            }), 202
+            }, 202)
         except Exception as e:
             logger.error("Failed to publish web interaction to Pub/Sub", error=e, correlation_id=correlation_id, topic=topic)
             response, status_code = get_error_response('web', 'unavailable')
-            return jsonify(response), status_code
+            return json_response(response, status_code)
 
     except Exception as e:
         logger.error("Critical error in web_interactions", error=e, correlation_id=correlation_id)
         response, status_code = get_error_response('web', 'internal')
-        return jsonify(response), status_code
+        return json_response(response, status_code)
 
 
 @traced_function("discord_interaction")
@@ -178,22 +286,30 @@ def discord_interactions(request: Request):
 
         if not signature or not timestamp:
             logger.warning("Missing Discord signature headers", correlation_id=correlation_id)
-            return jsonify({'error': 'Bad Request - Missing headers'}), 400
+            return json_response({'error': 'Bad Request - Missing headers'}, 400)
 
         body = request.get_data()
         if not verify_discord_signature(signature, timestamp, body):
             logger.warning("Invalid Discord signature", correlation_id=correlation_id)
-            return jsonify({'error': 'Unauthorized'}), 401
+            return json_response({'error': 'Unauthorized'}, 401)
 
-        interaction = request.get_json(silent=True)
-        if not interaction:
+        # Parse the verified bytes once instead of letting Flask decode them again
+        try:
+            interaction = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            interaction = None
+        if not interaction or not isinstance(interaction, dict):
             logger.warning("Invalid JSON in Discord interaction", correlation_id=correlation_id)
-            return jsonify({'error': 'Bad Request - Invalid JSON'}), 400
+            return json_response({'error': 'Bad Request - Invalid JSON'}, 400)
 
         interaction_type = interaction.get('type')
+        if interaction_type == 1:
+            # PING never needs user checks or Pub/Sub
+            return Response(_PONG_BODY, 200, mimetype='application/json')
+
         interaction_id = interaction.get('id')
 
-        logger.info(
+        logger.debug(
             "Processing Discord interaction",
             correlation_id=correlation_id,
             interaction_type=interaction_type,
@@ -203,17 +319,18 @@ def discord_interactions(request: Request):
         result = process_interaction(interaction, 'discord', correlation_id=correlation_id)
         if result:
             response, status_code = result
-            logger.info(
-                "Discord interaction processed immediately",
-                correlation_id=correlation_id,
-                status_code=status_code
-            )
-            return jsonify(response), status_code
-
-        if interaction.get('type') == 2:
+            if _sample_success_log():
+                logger.info(
+                    "Discord interaction processed immediately",
+                    correlation_id=correlation_id,
+                    status_code=status_code
+                )
+            return json_response(response, status_code)
+
+        if interaction_type == 2:
             command_name = interaction.get('data', {}).get('name')
             topic = get_topic_for_command(command_name)
-            logger.info(
+            logger.debug(
                 "Discord command received",
                 correlation_id=correlation_id,
                 command_name=command_name,
@@ -224,17 +341,23 @@ def discord_interactions(request: Request):
 
         pubsub_data = prepare_pubsub_data(interaction, 'discord', signature, timestamp, request)
         pubsub_data['correlation_id'] = correlation_id  # Propagate correlation ID
+        # Embed the verified body as-is so it is not re-serialized on publish
+        pubsub_data['interaction'] = orjson.Fragment(body)
 
         try:
-            message_id = publish_to_pubsub(topic, pubsub_data, logger=logger, correlation_id=correlation_id)
-            logger.info(
-                "Published Discord interaction to Pub/Sub",
-                correlation_id=correlation_id,
-                topic=topic,
-                message_id=message_id,
-                command_name=command_name if interaction.get('type') == 2 else None
-            )
-            return jsonify({'type': 5}), 200
+            # Only defer once the message is acknowledged: a deferred reply
+            # whose publish failed would leave the user on "thinking..."
+            # forever, and after the response the instance CPU is throttled
+            publish_to_pubsub(
+                topic,
+                pubsub_data,
+                logger=logger,
+                log_success=_sample_success_log(),
+                interaction_type=interaction_type,
+                interaction_id=interaction_id,
+                command_name=command_name if interaction_type == 2 else None
+            ).result(timeout=DISCORD_PUBLISH_TIMEOUT)
+            return Response(_DEFERRED_BODY, 200, mimetype='application/json')
         except Exception as e:
             logger.error(
                 "Failed to publish Discord interaction to Pub/Sub",
@@ -243,7 +366,7 @@ def discord_interactions(request: Request):
                 topic=topic
             )
             response, status_code = get_error_response('discord', 'unavailable')
-            return jsonify(response), status_code
+            return json_response(response, status_code)
 
     except Exception as e:
         logger.error(
@@ -252,7 +375,7 @@ def discord_interactions(request: Request):
             correlation_id=correlation_id
         )
         response, status_code = get_error_response('discord', 'internal')
-        return jsonify(response), status_code
+        return json_response(response, status_code)
 
 
 def _extract_session_id(request: Request) -> str | None:
@@ -270,36 +393,78 @@ def _extract_session_id(request: Request) -> str | None:
 
 
 def _verify_web_session(session_id: str, correlation_id: str | None):
-    """Call auth-service to verify the session."""
+    """Verify the session, using the local cache before calling auth-service.
+
+    Valid sessions are cached for SESSION_CACHE_TTL seconds and rejected ones
+    for SESSION_CACHE_NEGATIVE_TTL seconds. Auth-service outages are not cached.
+    Concurrent cache misses for the same session wait on the first caller's
+    auth-service request instead of issuing their own.
+    """
     if not AUTH_SERVICE_URL:
         logger.error("AUTH_SERVICE_URL not configured", correlation_id=correlation_id)
         return None, 500, "Auth service unavailable"
 
-    verify_url = f"{AUTH_SERVICE_URL}/auth/verify"
+    cache_key = _session_cache_key(session_id)
+    cached = _get_cached_session(cache_key)
+    if cached is not None:
+        logger.debug("Session verification cache hit", correlation_id=correlation_id)
+        return cached
+
+    # Single-flight: concurrent requests for the same session share one call
+    with _AUTH_CACHE_LOCK:
+        future = _AUTH_INFLIGHT.get(cache_key)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _AUTH_INFLIGHT[cache_key] = future
+
+    if not is_leader:
+        try:
+            return future.result(timeout=AUTH_VERIFY_WAIT_SECONDS)
+        except FutureTimeoutError:
+            logger.warning("Timed out waiting for in-flight session verification", correlation_id=correlation_id)
+            return None, 503, "Auth service unavailable"
 
+    result = (None, 503, "Auth service unavailable")
     try:
-        response = requests.post(
-            verify_url,
+        result = _call_auth_verify(session_id, correlation_id)
+        status_code = result[1]
+        if status_code == 200:
+            _cache_session(cache_key, result, SESSION_CACHE_TTL)
+        elif status_code == 401:
+            _cache_session(cache_key, result, SESSION_CACHE_NEGATIVE_TTL)
+    finally:
+        with _AUTH_CACHE_LOCK:
+            _AUTH_INFLIGHT.pop(cache_key, None)
+        future.set_result(result)
+    return result
+
+
+def _call_auth_verify(session_id: str, correlation_id: str | None):
+    """Call auth-service to verify the session."""
+    try:
+        response = _AUTH_SESSION.post(
+            _VERIFY_URL,
             json={'session_id': session_id},
-            timeout=5
+            timeout=(1, 5)
         )
     except requests.RequestException as exc:
         logger.error(
             "Auth service verification failed",
             error=str(exc),
             correlation_id=correlation_id,
-            verify_url=verify_url
+            verify_url=_VERIFY_URL
         )
         return None, 503, "Auth service unavailable"
 
-    if response.status_code == 200:
-        payload = response.json()
-        if payload.get('valid') and payload.get('user'):
-            return payload['user'], 200, None
-        return None, 401, payload.get('error') or "Invalid session"
+    if response.status_code in (200, 400, 401):
+        try:
+            payload = orjson.loads(response.content) if response.content else {}
+        except orjson.JSONDecodeError:
+            payload = {}
 
-    if response.status_code in (400, 401):
-        payload = response.json() if response.content else {}
+        if response.status_code == 200 and payload.get('valid') and payload.get('user'):
+            return payload['user'], 200, None
         return None, 401, payload.get('error') or "Invalid session"
 
     logger.error(
@@ -335,3 +500,11 @@ def _inject_verified_user(interaction_data: dict, verified_user: dict):
         'avatar': avatar
     })
     interaction_data['user'] = user_block
+
+
+# --- Routes: (method, path) -> (handler, add CORS headers) ---
+_ROUTES = {
+    ('GET', '/health'): (health_handler, True),
+    ('POST', '/web/interactions'): (web_interactions, True),
+    ('POST', '/discord/interactions'): (discord_interactions, False),
+}
@@ -1,12 +1,68 @@
 """Pub/Sub utilities."""
-import json
+import atexit
+import threading
+from functools import lru_cache
 from typing import Optional
+import grpc
+import orjson
 from google.cloud import pubsub_v1
 
-from config import PROJECT_ID, PUBSUB_TOPIC_COMMANDS_BASE
+from shared.observability import CORRELATION_ID
+
+from config import (
+    PROJECT_ID,
+    PUBSUB_TOPIC_COMMANDS_BASE,
+    PUBSUB_TOPIC_INTERACTIONS,
+    COMMAND_TOPIC_MAP,
+    PUBSUB_BATCH_MAX_MESSAGES,
+    PUBSUB_BATCH_MAX_LATENCY,
+    PUBSUB_WARMUP_TIMEOUT
+)
+
+# One publisher per instance, shared by concurrent requests. Each request
+# publishes a single message, so batches default to one message and are sent
+# immediately, while the request still holds the CPU.
+# Flow control bounds the messages buffered by un-awaited publishes; past the
+# limit publish() raises so the request fails fast instead of stalling a thread.
+publisher = pubsub_v1.PublisherClient(
+    batch_settings=pubsub_v1.types.BatchSettings(
+        max_messages=PUBSUB_BATCH_MAX_MESSAGES,
+        max_latency=PUBSUB_BATCH_MAX_LATENCY,
+        max_bytes=1024 * 1024
+    ),
+    publisher_options=pubsub_v1.types.PublisherOptions(
+        enable_message_ordering=False,
+        flow_control=pubsub_v1.types.PublishFlowControl(
+            message_limit=1000,
+            byte_limit=10 * 1024 * 1024,
+            limit_exceeded_behavior=pubsub_v1.types.LimitExceededBehavior.ERROR
+        )
+    )
+)
+
+# Flush messages still batched or in flight when the instance shuts down
+atexit.register(publisher.stop)
+
+
+def _warm_publisher_channel():
+    """Connect the publisher's gRPC channel ahead of the first publish.
+
+    Runs in a background thread at cold start so the TCP/TLS handshake is
+    done (or in progress) before the first interaction arrives.
+    """
+    try:
+        channel = publisher.api.transport.grpc_channel
+        grpc.channel_ready_future(channel).result(timeout=PUBSUB_WARMUP_TIMEOUT)
+    except Exception:
+        # Best effort: the first publish connects the channel itself
+        pass
+
+
+if PUBSUB_WARMUP_TIMEOUT > 0:
+    threading.Thread(target=_warm_publisher_channel, name='pubsub-warmup', daemon=True).start()
 
-publisher = pubsub_v1.PublisherClient()
 
+@lru_cache(maxsize=128)
 def get_topic_for_command(command_name: str) -> str:
     """Get Pub/Sub topic for a command.
 
@@ -18,97 +74,84 @@ def get_topic_for_command(command_name: str) -> str:
     - colors -> commands-colors
     - pixel_info, getpixel -> commands-pixel-info
     - Others -> commands-base
-    """
-    # Microservices routing
-    command_topic_map = {
-        'draw': 'commands-draw',
-        'snapshot': 'commands-snapshot',
-        'canvas_state': 'commands-canvas-state',
-        'stats': 'commands-stats',
-        'colors': 'commands-colors',
-        'pixel_info': 'commands-pixel-info',
-        'getpixel': 'commands-pixel-info',
-    }
-
-    # Check if command has dedicated topic
-    if command_name in command_topic_map:
-        return command_topic_map[command_name]
 
+    Routing only depends on static configuration, so results are memoized.
+    """
     # Fallback to base topic for unknown commands
-    return PUBSUB_TOPIC_COMMANDS_BASE
+    return COMMAND_TOPIC_MAP.get(command_name, PUBSUB_TOPIC_COMMANDS_BASE)
 
 
-def publish_to_pubsub(topic_name: str, data: dict, logger=None, correlation_id: Optional[str] = None) -> str:
-    """Publish message to Pub/Sub topic.
+# Fully-qualified paths for every configured topic, built once at import
+_TOPIC_PATHS = {
+    name: publisher.topic_path(PROJECT_ID, name)
+    for name in {PUBSUB_TOPIC_COMMANDS_BASE, PUBSUB_TOPIC_INTERACTIONS, *COMMAND_TOPIC_MAP.values()}
+} if PROJECT_ID else {}
+
+
+def _topic_path(topic_name: str) -> str:
+    """Get the fully-qualified Pub/Sub topic path."""
+    topic_path = _TOPIC_PATHS.get(topic_name)
+    if topic_path is None:
+        topic_path = publisher.topic_path(PROJECT_ID, topic_name)
+    return topic_path
+
+
+def publish_to_pubsub(topic_name: str, data: dict, logger=None, correlation_id: Optional[str] = None,
+                      log_success: bool = True, **log_fields):
+    """Publish message to Pub/Sub and return the publish future.
+
+    The message joins the publisher's current batch and the outcome is logged
+    from a done callback. Callers wait on the returned future (with a bound)
+    before acknowledging the request, so a failed publish is reported to the
+    user instead of only being logged.
 
     Args:
         topic_name: Name of the Pub/Sub topic
         data: Dictionary data to publish
         logger: Logger instance (optional)
-        correlation_id: Correlation ID for tracing (optional)
+        correlation_id: Correlation ID for tracing (defaults to the current request's)
+        log_success: Log the published message ID (failures are always logged)
+        **log_fields: Extra fields for the published/failed log entry
 
     Returns:
-        Message ID from Pub/Sub
+        Publish future (resolves to the message ID)
 
     Raises:
         ValueError: If PROJECT_ID is not configured
-        Exception: If publishing fails
+        Exception: If the message cannot be queued
     """
-    try:
-        if not PROJECT_ID:
-            raise ValueError("PROJECT_ID not configured")
-
-        topic_path = publisher.topic_path(PROJECT_ID, topic_name)
-
-        # --- Extract command name for logging ---
-        command_name = None
-        interaction = data.get('interaction', {})
-        if interaction:
-            command_name = interaction.get('data', {}).get('name')
-
-        if logger:
+    if not PROJECT_ID:
+        raise ValueError("PROJECT_ID not configured")
+
+    future = publisher.publish(_topic_path(topic_name), orjson.dumps(data))
+
+    if logger:
+        # Callbacks run on the publisher's threads, capture the request context now
+        if correlation_id is None:
+            correlation_id = CORRELATION_ID.get()
+
+        def _log_result(f):
+            try:
+                message_id = f.result(timeout=0)
+            except Exception as e:
+                logger.error(
+                    "Failed to publish message to Pub/Sub",
+                    correlation_id=correlation_id,
+                    topic=topic_name,
+                    error=e,
+                    **log_fields
+                )
+                return
+            if not log_success:
+                return
             logger.info(
-                "Publishing message to Pub/Sub",
-                correlation_id=correlation_id,
-                topic=topic_name,
-                command_name=command_name,
-                interaction_type=data.get('interaction_type', 'discord')
-            )
-
-        message_data = json.dumps(data).encode('utf-8')
-        message_size = len(message_data)
-
-        future = publisher.publish(topic_path, message_data)
-        message_id = future.result(timeout=10)
-
-        if logger:
-            logger.info(
-                "Message published to Pub/Sub successfully",
+                "Published message to Pub/Sub",
                 correlation_id=correlation_id,
                 topic=topic_name,
                 message_id=message_id,
-                message_size_bytes=message_size,
-                command_name=command_name
+                **log_fields
             )
 
-        return message_id
-    except ValueError as e:
-        if logger:
-            logger.error(
-                "Configuration error publishing to Pub/Sub",
-                correlation_id=correlation_id,
-                topic=topic_name,
-                error=str(e)
-            )
-        raise
-    except Exception as e:
-        if logger:
-            logger.error(
-                "Failed to publish message to Pub/Sub",
-                correlation_id=correlation_id,
-                topic=topic_name,
-                command_name=command_name,
-                error=e
-            )
-        raise
+        future.add_done_callback(_log_result)
 
+    return future
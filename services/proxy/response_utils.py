@@ -1,5 +1,7 @@
 """Response utilities."""
 import os
+import orjson
+from flask import Response
 
 def get_proxy_url(request=None) -> str:
     """Get proxy URL for Cloud Functions Gen2, ensuring HTTPS.
@@ -40,6 +42,42 @@ def get_proxy_url(request=None) -> str:
     return proxy_url
 
 
+# Error payloads by (interaction_type, error_type), built once at import.
+# Callers only serialize them, they must not be mutated.
+_ERROR_RESPONSES = {
+    ('discord', 'unavailable'): ({
+        'type': 4,
+        'data': {
+            'embeds': [{
+                'title': 'Service Temporarily Unavailable',
+                'description': 'The message queue is temporarily unavailable. Please try again in a moment.',
+                'color': 0xFF0000,
+                'footer': {'text': 'Service continues running - error logged'}
+            }]
+        }
+    }, 200),
+    ('discord', 'internal'): ({
+        'type': 4,
+        'data': {
+            'embeds': [{
+                'title': 'Internal Error',
+                'description': 'An unexpected error occurred. The service is still running.',
+                'color': 0xFF0000,
+                'footer': {'text': 'Error logged - service continues running'}
+            }]
+        }
+    }, 200),
+    ('web', 'unavailable'): ({
+        'status': 'error',
+        'message': 'Service temporarily unavailable. Please try again in a moment.'
+    }, 503),
+    ('web', 'internal'): ({
+        'status': 'error',
+        'message': 'An unexpected error occurred.'
+    }, 500),
+}
+
+
 def get_error_response(interaction_type: str, error_type: str = 'unavailable') -> tuple:
     """Get error response formatted for interaction type.
 
@@ -50,39 +88,24 @@ def get_error_response(interaction_type: str, error_type: str = 'unavailable') -
     Returns:
         Tuple of (response_dict, status_code)
     """
-    if interaction_type == 'discord':
-        if error_type == 'unavailable':
-            return {
-                'type': 4,
-                'data': {
-                    'embeds': [{
-                        'title': 'Service Temporarily Unavailable',
-                        'description': 'The message queue is temporarily unavailable. Please try again in a moment.',
-                        'color': 0xFF0000,
-                        'footer': {'text': 'Service continues running - error logged'}
-                    }]
-                }
-            }, 200
-        else:
-            return {
-                'type': 4,
-                'data': {
-                    'embeds': [{
-                        'title': 'Internal Error',
-                        'description': 'An unexpected error occurred. The service is still running.',
-                        'color': 0xFF0000,
-                        'footer': {'text': 'Error logged - service continues running'}
-                    }]
-                }
-            }, 200
-    else:
-        if error_type == 'unavailable':
-            return {
-                'status': 'error',
-                'message': 'Service temporarily unavailable. Please try again in a moment.'
-            }, 503
-        else:
-            return {
-                'status': 'error',
-                'message': 'An unexpected error occurred.'
-            }, 500
+    kind = 'discord' if interaction_type == 'discord' else 'web'
+    if error_type != 'unavailable':
+        error_type = 'internal'
+    return _ERROR_RESPONSES[(kind, error_type)]
+
+
+def json_response(payload, status_code: int = 200) -> Response:
+    """Build a JSON response with the given status code.
+
+    Every proxy handler returns a ``Response`` built here so the router never
+    has to normalize tuples.
+
+    Args:
+        payload: JSON-serializable body
+        status_code: HTTP status code
+
+    Returns:
+        Flask Response
+    """
+    body = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return Response(body, status=status_code, mimetype='application/json')
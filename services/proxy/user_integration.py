@@ -1,7 +1,12 @@
-"""Integration with user-manager service for rate limiting and user management."""
+"""Integration with user-manager service for user registration checks."""
 import os
+import time
+import threading
 import requests
-from typing import Optional, Dict, Tuple
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional, Dict
 from shared.observability import init_observability
 from shared.processor_utils import get_authenticated_headers
 
@@ -10,8 +15,48 @@ logger, _ = init_observability('discord-proxy', app=None)
 # User manager service URL
 USER_MANAGER_URL = os.environ.get('USER_MANAGER_URL', '')
 
+# Without a user-manager (local/dev) every check short-circuits
+_DISABLED = not USER_MANAGER_URL
+if _DISABLED:
+    logger.warning("USER_MANAGER_URL not configured, skipping user checks")
+
 # Timeout for user-manager requests (in seconds)
 USER_MANAGER_TIMEOUT = float(os.getenv('USER_MANAGER_TIMEOUT', '10'))
+# Connects fail fast on a dead backend; the read keeps the full budget
+USER_MANAGER_CONNECT_TIMEOUT = float(os.getenv('USER_MANAGER_CONNECT_TIMEOUT', '0.5'))
+
+# --- Connection pooling ---
+# One keep-alive pool per instance so user-manager calls skip the TCP+TLS
+# handshake. Gateway errors are only retried for idempotent methods (urllib3
+# default).
+_RETRY_TOTAL = 2
+_RETRY_BACKOFF = 0.1
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=Retry(total=_RETRY_TOTAL, backoff_factor=_RETRY_BACKOFF,
+                      status_forcelist=[502, 503, 504], raise_on_status=False)
+))
+# Worst case for one user-manager GET: every attempt uses its full connect and
+# read timeouts, plus the backoff sleeps between attempts and a margin for the
+# identity token fetch
+_REQUEST_MAX_DURATION = (
+    (_RETRY_TOTAL + 1) * (USER_MANAGER_CONNECT_TIMEOUT + USER_MANAGER_TIMEOUT)
+    + sum(_RETRY_BACKOFF * 2 ** i for i in range(_RETRY_TOTAL))
+    + 5.0
+)
+
+# --- Registered-user cache ---
+# Positive registration lookups are reused for a few seconds so a user
+# sending a burst of commands costs one GET. Kept short (<= 15s); bans are
+# enforced by the processors' rate-limit check, not by this cache.
+USER_CACHE_TTL = min(float(os.getenv('USER_CACHE_TTL', '10')), 15.0)
+USER_CACHE_MAX_ENTRIES = 10000
+_registered_users: Dict[str, float] = {}
+_registered_lock = threading.Lock()
+# Lookups currently in progress, keyed by user ID
+_registered_inflight: Dict[str, Future] = {}
 
 
 def get_user_id_from_interaction(interaction: dict) -> Optional[str]:
@@ -44,6 +89,10 @@ def is_user_registered(
 ) -> bool:
     """Check if user is registered in the system.
 
+    Registered users are cached for USER_CACHE_TTL seconds. Concurrent lookups
+    for the same user wait on the first caller's request instead of issuing
+    their own.
+
     Args:
         user_id: Discord user ID
         correlation_id: Correlation ID for logging
@@ -51,16 +100,60 @@ def is_user_registered(
     Returns:
         True if user is registered, False otherwise
     """
-    if not USER_MANAGER_URL:
+    if _DISABLED:
         return False
 
+    with _registered_lock:
+        expires = _registered_users.get(user_id)
+        if expires is not None:
+            if time.monotonic() < expires:
+                return True
+            del _registered_users[user_id]
+
+        future = _registered_inflight.get(user_id)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _registered_inflight[user_id] = future
+
+    if not is_leader:
+        try:
+            # Outlasts the leader's own request, retries included
+            return future.result(timeout=_REQUEST_MAX_DURATION)
+        except FutureTimeoutError:
+            # Leader is stuck past its worst case: look the user up directly
+            # rather than reporting a registered user as unregistered
+            logger.warning(
+                "Timed out waiting for in-flight registration lookup",
+                correlation_id=correlation_id,
+                user_id=user_id
+            )
+            return _fetch_user_registered(user_id, correlation_id)
+
+    registered = False
+    try:
+        registered = _fetch_user_registered(user_id, correlation_id)
+        if registered:
+            with _registered_lock:
+                _registered_users[user_id] = time.monotonic() + USER_CACHE_TTL
+                while len(_registered_users) > USER_CACHE_MAX_ENTRIES:
+                    del _registered_users[next(iter(_registered_users))]
+    finally:
+        with _registered_lock:
+            _registered_inflight.pop(user_id, None)
+        future.set_result(registered)
+    return registered
+
+
+def _fetch_user_registered(user_id: str, correlation_id: Optional[str] = None) -> bool:
+    """Ask user-manager whether the user exists."""
     try:
         headers = get_authenticated_headers(USER_MANAGER_URL, correlation_id, logger)
 
-        user_response = requests.get(
+        user_response = _session.get(
             f"{USER_MANAGER_URL}/api/users/{user_id}",
             headers=headers,
-            timeout=USER_MANAGER_TIMEOUT
+            timeout=(USER_MANAGER_CONNECT_TIMEOUT, USER_MANAGER_TIMEOUT)
         )
 
         return user_response.status_code == 200
@@ -80,168 +173,3 @@ def is_user_registered(
             user_id=user_id
         )
         return False
-
-
-def check_user_allowed(
-    user_id: str,
-    command: str,
-    correlation_id: Optional[str] = None,
-    user_payload: Optional[Dict] = None
-) -> Tuple[bool, Optional[Dict], Optional[str]]:
-    """Check if user is allowed to execute command (not banned, rate limit OK).
-
-    Args:
-        user_id: Discord user ID
-        command: Command name
-        correlation_id: Correlation ID for logging
-
-    Returns:
-        Tuple of (allowed: bool, rate_limit_info: dict or None, error_message: str or None)
-    """
-    if not USER_MANAGER_URL:
-        logger.warning(
-            "USER_MANAGER_URL not configured, skipping user checks",
-            correlation_id=correlation_id,
-            user_id=user_id,
-            command=command
-        )
-        return True, None, None
-
-    try:
-        # Get authenticated headers
-        headers = get_authenticated_headers(USER_MANAGER_URL, correlation_id, logger)
-        headers['Content-Type'] = 'application/json'
-
-        # First, get user to check if banned and get premium status
-        user_response = requests.get(
-            f"{USER_MANAGER_URL}/api/users/{user_id}",
-            headers=headers,
-            timeout=USER_MANAGER_TIMEOUT
-        )
-
-        is_premium = False
-        if user_response.status_code == 200:
-            user_data = user_response.json()
-            if user_data.get('is_banned'):
-                logger.warning(
-                    "Banned user attempted command",
-                    correlation_id=correlation_id,
-                    user_id=user_id,
-                    command=command
-                )
-                return False, None, "User is banned"
-            is_premium = user_data.get('is_premium', False)
-        elif user_response.status_code == 404:
-            logger.debug(
-                "User not found",
-                correlation_id=correlation_id,
-                user_id=user_id
-            )
-            # Don't auto-create here, user must register first
-        else:
-            # Error getting user, allow but log
-            logger.warning(
-                "Error getting user, allowing command",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                status_code=user_response.status_code
-            )
-
-        # Check rate limit
-        rate_limit_response = requests.post(
-            f"{USER_MANAGER_URL}/api/rate-limit/check",
-            json={
-                'user_id': user_id,
-                'command': command,
-                'is_premium': is_premium
-            },
-            headers=headers,
-            timeout=USER_MANAGER_TIMEOUT
-        )
-
-        if rate_limit_response.status_code == 429:
-            # Rate limit exceeded
-            rate_limit_info = rate_limit_response.json()
-            logger.warning(
-                "Rate limit exceeded",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                command=command,
-                remaining=rate_limit_info.get('remaining', 0),
-                reset_in=rate_limit_info.get('reset_in', 0)
-            )
-            return False, rate_limit_info, f"Rate limit exceeded. Try again in {rate_limit_info.get('reset_in', 0)} seconds"
-        elif rate_limit_response.status_code == 200:
-            rate_limit_info = rate_limit_response.json()
-            logger.debug(
-                "Rate limit check passed",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                command=command,
-                remaining=rate_limit_info.get('remaining', 0)
-            )
-            return True, rate_limit_info, None
-        else:
-            # Error checking rate limit, allow but log
-            logger.warning(
-                "Error checking rate limit, allowing command",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                status_code=rate_limit_response.status_code
-            )
-            return True, None, None
-
-    except requests.exceptions.Timeout:
-        logger.warning(
-            "Timeout checking user manager, allowing command",
-            correlation_id=correlation_id,
-            user_id=user_id,
-            command=command
-        )
-        return True, None, None
-    except Exception as e:
-        logger.error(
-            "Error checking user manager, allowing command",
-            error=e,
-            correlation_id=correlation_id,
-            user_id=user_id,
-            command=command
-        )
-        return True, None, None
-
-def get_rate_limit_error_response(
-    rate_limit_info: Dict,
-    interaction_type: str = 'discord'
-) -> Tuple[Dict, int]:
-    """Get error response for rate limit exceeded.
-
-    Args:
-        rate_limit_info: Rate limit information from user-manager
-        interaction_type: 'discord' or 'web'
-
-    Returns:
-        Tuple of (response_dict, status_code)
-    """
-    remaining = rate_limit_info.get('remaining', 0)
-    reset_in = rate_limit_info.get('reset_in', 0)
-    max_calls = rate_limit_info.get('max', 0)
-
-    if interaction_type == 'discord':
-        return {
-            'type': 4,
-            'data': {
-                'content': f"⏱️ Rate limit exceeded! You've used {max_calls - remaining}/{max_calls} calls. Try again in {reset_in} seconds.",
-                'flags': 64  # Ephemeral
-            }
-        }, 200
-    else:
-        return {
-            'status': 'error',
-            'message': f"Rate limit exceeded. Try again in {reset_in} seconds.",
-            'rate_limit': {
-                'remaining': remaining,
-                'reset_in': reset_in,
-                'max': max_calls
-            }
-        }, 429
-
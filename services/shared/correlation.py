@@ -4,6 +4,10 @@ import time
 from functools import wraps
 from typing import Callable
 
+from flask import Request, has_request_context, request as flask_request
+
+from shared.observability import get_correlation_id, CORRELATION_ID
+
 def with_correlation(logger):
     """Decorator to handle correlation ID and request logging.
 
@@ -26,37 +30,16 @@ def with_correlation(logger):
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
-            from shared.observability import get_correlation_id
-
-            # Detect if we're in a Flask context or Cloud Functions context
-            # Try to get request from Flask context first
-            try:
-                from flask import request as flask_request
-                # Check if we're in a Flask request context
-                if hasattr(flask_request, 'method'):
-                    req = flask_request
-                    is_flask = True
-                else:
-                    req = None
-                    is_flask = False
-            except (RuntimeError, ImportError):
-                # Not in Flask context
+            # Cloud Functions pass the request as first argument; Flask apps
+            # only have it in the request context
+            if args and isinstance(args[0], Request):
+                req = args[0]
+            elif has_request_context():
+                req = flask_request
+            else:
                 req = None
-                is_flask = False
 
-            # If not Flask, try to get request from first positional argument (Cloud Functions)
-            if not is_flask and args and hasattr(args[0], 'method') and hasattr(args[0], 'path'):
-                req = args[0]
-            elif not req:
-                # Fallback: try to import Request type and check if first arg matches
-                try:
-                    from flask import Request
-                    if args and isinstance(args[0], Request):
-                        req = args[0]
-                except (ImportError, TypeError):
-                    pass
-
-            if not req:
+            if req is None:
                 # No request object found, log warning and proceed without correlation
                 logger.warning("No request object found for correlation tracking")
                 return func(*args, **kwargs)
@@ -64,9 +47,11 @@ def with_correlation(logger):
             # Get or generate correlation ID
             correlation_id = get_correlation_id(req)
 
-            # Store in request object for easy access
+            # Store in request object and request context for easy access
             req.correlation_id = correlation_id
-            req.start_time = time.time()
+            # Monotonic clock: durations stay correct across NTP adjustments
+            start_ns = time.monotonic_ns()
+            context_token = CORRELATION_ID.set(correlation_id)
 
             # Log request start
             logger.info(
@@ -85,12 +70,20 @@ def with_correlation(logger):
                 result = func(*args, **kwargs)
 
                 # Calculate duration
-                duration_ms = (time.time() - req.start_time) * 1000
+                duration_ms = (time.monotonic_ns() - start_ns) / 1_000_000
 
-                # Extract status code from result
-                status_code = 200
-                if isinstance(result, tuple):
+                # Normalize the result once: Response objects keep their own
+                # status and are only tagged, tuples/bare bodies get a headers dict
+                if hasattr(result, 'status_code') and hasattr(result, 'headers'):
+                    status_code = result.status_code
+                    result.headers['X-Correlation-ID'] = correlation_id
+                else:
+                    if not isinstance(result, tuple):
+                        result = (result, 200)
                     status_code = result[1] if len(result) > 1 else 200
+                    headers = result[2] if len(result) > 2 and isinstance(result[2], dict) else {}
+                    headers['X-Correlation-ID'] = correlation_id
+                    result = (result[0], status_code, headers)
 
                 # Log request completion
                 logger.info(
@@ -99,39 +92,25 @@ def with_correlation(logger):
                     method=req.method,
                     path=req.path,
                     status_code=status_code,
-                    duration_ms=round(duration_ms, 2)
+                    duration_ms=duration_ms
                 )
 
-                # Add correlation ID to response headers if result is a tuple
-                if isinstance(result, tuple) and len(result) >= 2:
-                    response_data, status = result[0], result[1]
-                    headers = result[2] if len(result) > 2 else {}
-
-                    # Ensure headers dict exists and add correlation ID
-                    if not isinstance(headers, dict):
-                        headers = {}
-                    headers['X-Correlation-ID'] = correlation_id
-
-                    return response_data, status, headers
-                elif isinstance(result, tuple):
-                    # If only (data, status), add headers
-                    return result[0], result[1], {'X-Correlation-ID': correlation_id}
-                else:
-                    # If just data, wrap it
-                    return result, 200, {'X-Correlation-ID': correlation_id}
+                return result
 
             except Exception as e:
                 # Log error
-                duration_ms = (time.time() - req.start_time) * 1000
+                duration_ms = (time.monotonic_ns() - start_ns) / 1_000_000
                 logger.error(
                     "Request failed",
                     error=e,
                     correlation_id=correlation_id,
                     method=req.method,
                     path=req.path,
-                    duration_ms=round(duration_ms, 2)
+                    duration_ms=duration_ms
                 )
                 raise
+            finally:
+                CORRELATION_ID.reset(context_token)
 
         return wrapper
     return decorator
@@ -341,6 +341,9 @@ def rate_limit_embed(result: Dict[str, Any], command_label: str) -> dict:
     Returns:
         Discord interaction response dict with warning embed
     """
+    if result.get('banned'):
+        return create_error_embed('Access denied', 'Your account is banned from using commands.')
+
     reset_time = result.get('reset_in', 0)
     minutes = reset_time // 60
     seconds = reset_time % 60
@@ -1,12 +1,27 @@
 """In-memory cache implementation with TTL."""
+import os
+import threading
 import time
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Any
+
+# Every SWEEP_EVERY sets, expired entries are dropped from the cache
+SWEEP_EVERY = 256
+
 
 class SimpleCache:
-    """In-memory cache with TTL for performance."""
+    """In-memory LRU cache with TTL for performance.
 
-    def __init__(self):
-        self._cache: Dict[str, tuple[Any, float]] = {}
+    Bounded to max_size entries: the least recently used entry is evicted
+    first. Expiry uses time.monotonic() so wall-clock jumps cannot extend or
+    cut short an entry's lifetime.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self._cache: "OrderedDict[str, tuple[Any, float]]" = OrderedDict()
+        self._max = max(1, max_size)
+        self._lock = threading.RLock()
+        self._sets_since_sweep = 0
 
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache.
@@ -17,12 +32,15 @@ class SimpleCache:
         Returns:
             Cached value or None if not found/expired
         """
-        if key in self._cache:
-            value, expires = self._cache[key]
-            if time.time() < expires:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if time.monotonic() < expires:
+                self._cache.move_to_end(key)
                 return value
-            else:
-                del self._cache[key]
+            del self._cache[key]
         return None
 
     def set(self, key: str, value: Any, ttl: int = 60):
@@ -33,8 +51,23 @@ class SimpleCache:
             value: Value to cache
             ttl: Time to live in seconds (default: 60)
         """
-        expires = time.time() + ttl
-        self._cache[key] = (value, expires)
+        now = time.monotonic()
+        with self._lock:
+            self._cache[key] = (value, now + ttl)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._max:
+                self._cache.popitem(last=False)
+
+            self._sets_since_sweep += 1
+            if self._sets_since_sweep >= SWEEP_EVERY:
+                self._sets_since_sweep = 0
+                self._sweep(now)
+
+    def _sweep(self, now: float):
+        """Drop expired entries (caller holds the lock)."""
+        expired = [key for key, (_, expires) in self._cache.items() if expires <= now]
+        for key in expired:
+            del self._cache[key]
 
     def delete(self, key: str):
         """Delete from cache.
@@ -42,12 +75,13 @@ class SimpleCache:
         Args:
             key: Cache key to delete
         """
-        if key in self._cache:
-            del self._cache[key]
+        with self._lock:
+            self._cache.pop(key, None)
 
     def clear(self):
         """Clear all cache."""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
 
     def size(self) -> int:
         """Get current cache size.
@@ -59,4 +93,4 @@ class SimpleCache:
 
 
 # --- Global cache instance ---
-cache = SimpleCache()
+cache = SimpleCache(max_size=int(os.getenv('CACHE_MAX_ENTRIES', '10000')))
@@ -1,87 +1,84 @@
 """HTTP request handlers for user management service."""
-from typing import Optional, Dict, Any
-from datetime import datetime
-from flask import Request, jsonify
+import re
+from typing import Any, Optional
+import orjson
+from flask import Request
+from response_utils import json_response
 from user_manager import UserManager
 from rate_limiter import RateLimiter
 from stats_manager import StatsManager
-from shared.observability import init_observability
+from shared.observability import init_observability, CORRELATION_ID
 
 logger, _ = init_observability('user-management-service', app=None)
 
-
-def serialize_user_data(user_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Convert Firestore timestamps to ISO format strings for JSON serialization.
-
-    Args:
-        user_data: User data dict from Firestore
-
-    Returns:
-        User data dict with serializable timestamps
-    """
-    if not user_data:
-        return user_data
-
-    serialized = {}
-    for key, value in user_data.items():
-        if isinstance(value, datetime):
-            serialized[key] = value.isoformat()
-        else:
-            serialized[key] = value
-    return serialized
-
 # --- Initialize managers ---
 user_manager = UserManager()
 rate_limiter = RateLimiter()
 stats_manager = StatsManager()
 
+# --- Routes ---
+# /api/users, /api/users/{user_id} and /api/users/{user_id}/{action}, matched once
+_USER_ROUTE = re.compile(
+    r'^/api/users(?:/(?P<user_id>[^/]+)(?:/(?P<action>increment|ban|unban|premium))?)?$'
+)
+# /api/rate-limit/{user_id} (and /api/rate-limit/check)
+_RATE_LIMIT_ROUTE = re.compile(r'^/api/rate-limit/(?P<user_id>[^/]+)$')
+
+
+def load_json(request: Request) -> Optional[Any]:
+    """Parse the request body with orjson.
+
+    Args:
+        request: HTTP request object
 
-def get_correlation_id(request: Request) -> Optional[str]:
-    """Extract correlation ID from request."""
-    return getattr(request, 'correlation_id', request.headers.get('X-Correlation-ID'))
+    Returns:
+        Decoded JSON, or None if the body is empty or not valid JSON
+    """
+    # Bodyless POSTs (increment, ban) declare Content-Length: 0; skip the read
+    if request.content_length == 0:
+        return None
+    body = request.get_data(cache=False)
+    if not body:
+        return None
+    try:
+        return orjson.loads(body)
+    except orjson.JSONDecodeError:
+        return None
 
 def handle_users(request: Request, path: str, method: str):
     """Handle user management routes."""
-    correlation_id = get_correlation_id(request)
+    correlation_id = CORRELATION_ID.get()
 
-    logger.debug(
-        "Handling user request",
-        correlation_id=correlation_id,
-        path=path,
-        method=method
-    )
+    # Path and method are on the with_correlation "Request started" entry
+    logger.debug("Handling user request")
+
+    match = _USER_ROUTE.match(path)
+    user_id, action = match.group('user_id', 'action') if match else (None, None)
 
     # --- GET /api/users/{user_id} ---
-    if method == 'GET' and path.startswith('/api/users/'):
-        user_id = path.split('/')[-1]
+    if method == 'GET' and user_id and action is None:
         user = user_manager.get_user(user_id, correlation_id=correlation_id)
 
         if user:
             logger.info(
                 "User retrieved",
-                correlation_id=correlation_id,
                 user_id=user_id
             )
-            # Serialize timestamps for JSON response
-            serialized_user = serialize_user_data(user)
-            return jsonify(serialized_user), 200
+            # Firestore timestamps are serialized by json_response
+            return json_response(user, 200)
         else:
             logger.warning(
                 "User not found",
-                correlation_id=correlation_id,
                 user_id=user_id
             )
-            return jsonify({'error': 'User not found'}), 404
+            return json_response({'error': 'User not found'}, 404)
 
     # --- POST /api/users - Create/Update user ---
-    elif method == 'POST' and path == '/api/users':
-        data = request.get_json()
+    elif method == 'POST' and match and user_id is None:
+        data = load_json(request)
         if not data:
-            logger.warning(
-                "Invalid JSON in create user request",
-                correlation_id=correlation_id
-            )
-            return jsonify({'error': 'Invalid JSON'}), 400
+            logger.warning("Invalid JSON in create user request")
+            return json_response({'error': 'Invalid JSON'}, 400)
 
         user_id = data.get('user_id')
         username = data.get('username')
@@ -89,71 +86,59 @@ def handle_users(request: Request, path: str, method: str):
         if not user_id or not username:
             logger.warning(
                 "Missing required fields in create user request",
-                correlation_id=correlation_id,
                 has_user_id=bool(user_id),
                 has_username=bool(username)
             )
-            return jsonify({'error': 'user_id and username required'}), 400
+            return json_response({'error': 'user_id and username required'}, 400)
+
+        extra_fields = {k: v for k, v in data.items() if k not in ('user_id', 'username')}
 
         try:
-            logger.info(
+            logger.debug(
                 "Starting user creation/update",
-                correlation_id=correlation_id,
                 user_id=user_id,
-                username=username,
-                additional_fields=list({k: v for k, v in data.items() if k not in ['user_id', 'username']}.keys())
+                additional_fields=list(extra_fields)
             )
 
             user = user_manager.create_or_update_user(
                 user_id,
                 username,
                 correlation_id=correlation_id,
-                **{k: v for k, v in data.items() if k not in ['user_id', 'username']}
+                **extra_fields
             )
 
-            logger.info(
-                "User created/updated in UserManager",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                has_user=bool(user),
-                user_keys=list(user.keys()) if user else []
-            )
-
-            serialized_user = serialize_user_data(user)
-
-            logger.info(
-                "User serialized",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                serialized_keys=list(serialized_user.keys()) if serialized_user else []
-            )
-
-            is_new = 'created_at' in serialized_user and serialized_user.get('created_at')
-
+            # Single INFO per create/update; intermediate steps stay at DEBUG
             logger.info(
                 "User created/updated successfully",
-                correlation_id=correlation_id,
                 user_id=user_id,
                 username=username,
-                is_new_user=bool(is_new),
-                has_created_at='created_at' in serialized_user
+                is_new_user=bool(user.get('created_at'))
             )
 
-            return jsonify(serialized_user), 200
+            return json_response(user, 200)
         except Exception as e:
             logger.error(
                 "Error creating/updating user",
                 error=e,
-                correlation_id=correlation_id,
                 user_id=user_id,
                 username=username
             )
-            return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
+            return json_response({'error': 'Internal server error', 'details': str(e)}, 500)
+
+    # --- POST /api/users/increment-bulk ---
+    elif method == 'POST' and user_id == 'increment-bulk' and action is None:
+        data = load_json(request) or {}
+        increments = data.get('increments')
+        if not isinstance(increments, list):
+            logger.warning("Invalid bulk increment payload")
+            return json_response({'error': 'increments list required'}, 400)
+
+        applied = user_manager.increment_usage_bulk(increments, correlation_id=correlation_id)
+        return json_response({'status': 'incremented', 'applied': applied}, 200)
 
     # --- POST /api/users/{user_id}/increment ---
-    elif method == 'POST' and '/increment' in path:
-        user_id = path.split('/')[-2]
-        data = request.get_json() or {}
+    elif method == 'POST' and action == 'increment':
+        data = load_json(request) or {}
         command = data.get('command', 'unknown')
         include_stats = data.get('include_stats', False)
 
@@ -168,129 +153,107 @@ def handle_users(request: Request, path: str, method: str):
                 response['is_premium'] = user_data.get('is_premium', False)
                 response['is_banned'] = user_data.get('is_banned', False)
 
-        return jsonify(response), 200
+        return json_response(response, 200)
 
     # --- POST /api/users/{user_id}/ban ---
-    elif method == 'POST' and '/ban' in path:
+    elif method == 'POST' and action == 'ban':
         try:
-            # Extract user_id from path: /api/users/{user_id}/ban
-            path_parts = path.split('/')
-            if len(path_parts) < 4 or path_parts[-1] != 'ban':
-                logger.warning(
-                    "Invalid ban path format",
-                    correlation_id=correlation_id,
-                    path=path
-                )
-                return jsonify({'error': 'Invalid path format'}), 400
-
-            user_id = path_parts[-2]
-            if not user_id:
-                logger.warning(
-                    "Missing user_id in ban path",
-                    correlation_id=correlation_id,
-                    path=path
-                )
-                return jsonify({'error': 'Missing user_id'}), 400
-
-            data = request.get_json() or {}
+            data = load_json(request) or {}
             reason = data.get('reason')
 
             success = user_manager.ban_user(user_id, reason, correlation_id=correlation_id)
             if success:
                 logger.info(
                     "User banned successfully",
-                    correlation_id=correlation_id,
                     user_id=user_id,
                     reason=reason
                 )
-                return jsonify({'status': 'banned'}), 200
+                return json_response({'status': 'banned'}, 200)
             else:
                 logger.error(
                     "Failed to ban user",
-                    correlation_id=correlation_id,
                     user_id=user_id
                 )
-                return jsonify({'error': 'Failed to ban user'}), 500
+                return json_response({'error': 'Failed to ban user'}, 500)
         except Exception as e:
             logger.error(
                 "Error in ban handler",
                 error=e,
-                correlation_id=correlation_id,
                 path=path
             )
-            return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
+            return json_response({'error': 'Internal server error', 'details': str(e)}, 500)
 
     # --- POST /api/users/{user_id}/unban ---
-    elif method == 'POST' and '/unban' in path:
-        user_id = path.split('/')[-2]
+    elif method == 'POST' and action == 'unban':
 
         success = user_manager.unban_user(user_id, correlation_id=correlation_id)
         if success:
-            return jsonify({'status': 'unbanned'}), 200
+            return json_response({'status': 'unbanned'}, 200)
         else:
-            return jsonify({'error': 'Failed to unban'}), 500
+            return json_response({'error': 'Failed to unban'}, 500)
 
     # --- PUT /api/users/{user_id}/premium ---
-    elif method == 'PUT' and '/premium' in path:
-        user_id = path.split('/')[-2]
-        data = request.get_json()
+    elif method == 'PUT' and action == 'premium':
+        data = load_json(request)
         if not data:
-            return jsonify({'error': 'Invalid JSON'}), 400
+            return json_response({'error': 'Invalid JSON'}, 400)
 
         is_premium = data.get('is_premium', False)
 
         success = user_manager.set_premium(user_id, is_premium, correlation_id=correlation_id)
         if success:
-            return jsonify({'status': 'updated'}), 200
+            return json_response({'status': 'updated'}, 200)
         else:
-            return jsonify({'error': 'Failed to update'}), 500
+            return json_response({'error': 'Failed to update'}, 500)
 
     logger.warning(
         "Unknown user route",
-        correlation_id=correlation_id,
         path=path,
         method=method
     )
-    return jsonify({'error': 'Not Found'}), 404
+    return json_response({'error': 'Not Found'}, 404)
 
 
 def handle_rate_limit(request: Request, path: str, method: str):
     """Handle rate limiting routes."""
-    correlation_id = get_correlation_id(request)
+    correlation_id = CORRELATION_ID.get()
+
+    match = _RATE_LIMIT_ROUTE.match(path)
+    user_id = match.group('user_id') if match else None
 
     # --- POST /api/rate-limit/check ---
-    if method == 'POST' and path == '/api/rate-limit/check':
-        data = request.get_json()
+    if method == 'POST' and user_id == 'check':
+        data = load_json(request)
         if not data:
-            return jsonify({'error': 'Invalid JSON'}), 400
+            return json_response({'error': 'Invalid JSON'}, 400)
 
         user_id = data.get('user_id')
         command = data.get('command')
+        # Callers may omit is_premium: it is resolved from the user record below
         is_premium = data.get('is_premium', False)
 
         if not user_id or not command:
             logger.warning(
                 "Missing required fields in rate limit check",
-                correlation_id=correlation_id,
                 has_user_id=bool(user_id),
                 has_command=bool(command)
             )
-            return jsonify({'error': 'user_id and command required'}), 400
+            return json_response({'error': 'user_id and command required'}, 400)
 
         # Check if user is banned
         user = user_manager.get_user(user_id, correlation_id=correlation_id)
         if user and user.get('is_banned'):
             logger.warning(
                 "Banned user attempted command",
-                correlation_id=correlation_id,
                 user_id=user_id,
                 command=command
             )
-            return jsonify({
+            return json_response({
                 'allowed': False,
+                'banned': True,
                 'error': 'User is banned',
                 'remaining': 0
-            }), 403
+            }, 403)
 
         # If user data has premium, use it
         if user and user.get('is_premium'):
@@ -300,67 +263,63 @@ def handle_rate_limit(request: Request, path: str, method: str):
         result = rate_limiter.check_rate_limit(user_id, command, is_premium, correlation_id=correlation_id)
 
         if not result['allowed']:
-            return jsonify(result), 429
+            return json_response(result, 429)
 
-        return jsonify(result), 200
+        return json_response(result, 200)
 
     # GET /api/rate-limit/{user_id}
-    elif method == 'GET' and path.startswith('/api/rate-limit/'):
-        user_id = path.split('/')[-1]
+    elif method == 'GET' and user_id:
         command = request.args.get('command', 'draw')
 
         user = user_manager.get_user(user_id, correlation_id=correlation_id)
         is_premium = user.get('is_premium', False) if user else False
 
         info = rate_limiter.get_limits_info(user_id, command, is_premium, correlation_id=correlation_id)
-        return jsonify(info), 200
+        return json_response(info, 200)
 
     # DELETE /api/rate-limit/{user_id}
-    elif method == 'DELETE' and path.startswith('/api/rate-limit/'):
-        user_id = path.split('/')[-1]
+    elif method == 'DELETE' and user_id:
         command = request.args.get('command')
 
         rate_limiter.reset_limits(user_id, command, correlation_id=correlation_id)
-        return jsonify({'status': 'reset'}), 200
+        return json_response({'status': 'reset'}, 200)
 
     logger.warning(
         "Unknown rate limit route",
-        correlation_id=correlation_id,
         path=path,
         method=method
     )
-    return jsonify({'error': 'Not Found'}), 404
+    return json_response({'error': 'Not Found'}, 404)
 
 
 def handle_stats(request: Request, path: str, method: str):
     """Handle statistics routes."""
-    correlation_id = get_correlation_id(request)
+    correlation_id = CORRELATION_ID.get()
 
     # GET /api/stats/users
     if path == '/api/stats/users':
         count = stats_manager.get_user_count(correlation_id=correlation_id)
-        return jsonify({'total_users': count}), 200
+        return json_response({'total_users': count}, 200)
 
     # GET /api/stats/active
     elif path == '/api/stats/active':
         hours = int(request.args.get('hours', 24))
         count = stats_manager.get_active_users(hours, correlation_id=correlation_id)
-        return jsonify({
+        return json_response({
             'active_users': count,
             'period_hours': hours
-        }), 200
+        }, 200)
 
     # GET /api/stats/leaderboard
     elif path == '/api/stats/leaderboard':
         limit = int(request.args.get('limit', 10))
         leaderboard = stats_manager.get_leaderboard(limit, correlation_id=correlation_id)
-        return jsonify({'leaderboard': leaderboard}), 200
+        return json_response({'leaderboard': leaderboard}, 200)
 
     logger.warning(
         "Unknown stats route",
-        correlation_id=correlation_id,
         path=path,
         method=method
     )
-    return jsonify({'error': 'Not Found'}), 404
+    return json_response({'error': 'Not Found'}, 404)
 
@@ -3,116 +3,127 @@ User Management Service with Functions Framework for Cloud Functions Gen2
 Handles user CRUD, rate limiting, bans, premium, stats
 """
 import os
+import random
 import functions_framework
-from flask import Request, jsonify
+from flask import Request
+from response_utils import json_response
 from shared.correlation import with_correlation
-from shared.observability import init_observability, traced_function
+from shared.observability import init_observability, traced_function, TRACE_SAMPLED
 from shared.auth_utils import verify_service_auth
 from cache import cache
 from handlers import handle_users, handle_rate_limit, handle_stats
 
 logger, tracing = init_observability('user-management-service', app=None)
 
+# --- CORS preflight ---
+_CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE',
+    'Access-Control-Allow-Headers': 'Content-Type, X-Correlation-ID, Authorization',
+    'Access-Control-Max-Age': '3600'
+}
+
+# --- Route prefixes, checked in order ---
+_DISPATCH = (
+    ('/api/users', handle_users),
+    ('/api/rate-limit', handle_rate_limit),
+    ('/api/stats', handle_stats),
+)
+
+# --- Trace sampling: fraction of requests traced, by path (default 1.0) ---
+TRACE_SAMPLE_RATE_BY_PATH = {
+    '/api/rate-limit/check': float(os.getenv('RATE_LIMIT_TRACE_SAMPLE_RATE', '0.01')),
+}
+
 
 @functions_framework.http
-@with_correlation(logger)
-@traced_function("user_management_handler")
 def user_management_handler(request: Request):
     """Main HTTP handler for user management.
 
+    Preflight requests are answered here, before correlation and tracing.
+    Other requests are traced with the sample rate configured for their path.
+
     Args:
         request: HTTP request object
 
     Returns:
         HTTP response object
     """
+    if request.method == 'OPTIONS':
+        return ('', 204, _CORS_HEADERS)
+
+    sample_rate = TRACE_SAMPLE_RATE_BY_PATH.get(request.path, 1.0)
+    sampled = sample_rate >= 1.0 or random.random() < sample_rate
+    sampled_token = TRACE_SAMPLED.set(sampled)
+    try:
+        return _handle_request(request)
+    finally:
+        TRACE_SAMPLED.reset(sampled_token)
+
+
+@with_correlation(logger)
+@traced_function("user_management_handler")
+def _handle_request(request: Request):
+    """Authenticate and dispatch a user management request."""
     path = request.path
     method = request.method
-    correlation_id = getattr(request, 'correlation_id', request.headers.get('X-Correlation-ID'))
-
-    # CORS headers
-    if method == 'OPTIONS':
-        headers = {
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE',
-            'Access-Control-Allow-Headers': 'Content-Type, X-Correlation-ID, Authorization',
-            'Access-Control-Max-Age': '3600'
-        }
-        return ('', 204, headers)
 
     if path != '/health' or method != 'GET':
         is_valid, error_msg = verify_service_auth(request, expected_audience=None, logger_instance=logger)
         if not is_valid:
             logger.warning(
                 "Authentication failed",
-                correlation_id=correlation_id,
                 path=path,
                 error=error_msg
             )
-            return jsonify({
+            return json_response({
                 'error': 'Unauthorized',
                 'message': error_msg or 'Authentication required'
-            }), 401
+            }, 401)
 
     try:
         # --- Health check ---
         if path == '/health' and method == 'GET':
             return handle_health(request)
 
-        # --- User Management Routes ---
-        elif path.startswith('/api/users'):
-            return handle_users(request, path, method)
-
-        # --- Rate Limiting Routes ---
-        elif path.startswith('/api/rate-limit'):
-            return handle_rate_limit(request, path, method)
-
-        # --- Stats Routes ---
-        elif path.startswith('/api/stats'):
-            return handle_stats(request, path, method)
+        for prefix, handler in _DISPATCH:
+            if path.startswith(prefix):
+                return handler(request, path, method)
 
-        else:
-            logger.warning(
-                "Unknown path requested",
-                correlation_id=correlation_id,
-                path=path,
-                method=method
-            )
-            return jsonify({
-                'error': 'Not Found',
-                'path': path,
-                'method': method
-            }), 404
+        logger.warning(
+            "Unknown path requested",
+            path=path,
+            method=method
+        )
+        return json_response({
+            'error': 'Not Found',
+            'path': path,
+            'method': method
+        }, 404)
 
     except Exception as e:
         logger.error(
             "Unhandled error in user management handler",
             error=e,
-            correlation_id=correlation_id,
             path=path,
             method=method
         )
         import traceback
         traceback.print_exc()
-        return jsonify({
+        return json_response({
             'error': 'Internal Server Error',
             'details': str(e)
-        }), 500
+        }, 500)
 
 
 @traced_function("handle_health")
 def handle_health(request: Request):
     """Health check endpoint."""
-    correlation_id = getattr(request, 'correlation_id', request.headers.get('X-Correlation-ID'))
-
-    logger.info(
-        "Health check called",
-        correlation_id=correlation_id
-    )
+    logger.info("Health check called")
 
-    return jsonify({
+    return json_response({
         'status': 'healthy',
         'service': 'user-management-service',
         'framework': 'functions_framework',
         'cache_size': cache.size()
-        }), 200
+        }, 200)
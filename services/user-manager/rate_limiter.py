@@ -1,55 +1,54 @@
 """Rate limiting system."""
 import os
+import json
 import time
 from typing import Optional, Dict
 from google.cloud import firestore
+from shared.firestore_client import get_db
 from shared.observability import init_observability
 
 logger, _ = init_observability('user-management-service', app=None)
 
-_db_client = None
 
-def get_db():
-    """Get Firestore client singleton."""
-    global _db_client
-    if _db_client is None:
-        database_id = os.getenv('FIRESTORE_DATABASE', 'guidon-db')
-        _db_client = firestore.Client(database=database_id)
-    return _db_client
+# --- Rate limit configuration (parsed once at import) ---
+_DEFAULT_RATE_LIMITS = {
+    'draw': {
+        'default': {'calls': 10, 'period': 60},
+        'premium': {'calls': 30, 'period': 60}
+    },
+    'snapshot': {
+        'default': {'calls': 5, 'period': 300},
+        'premium': {'calls': 15, 'period': 300}
+    },
+    'default': {
+        'default': {'calls': 30, 'period': 60},
+        'premium': {'calls': 60, 'period': 60}
+    }
+}
+
+
+def _load_rate_limits() -> Dict:
+    """Read RATE_LIMITS_JSON, falling back to the defaults if unset or invalid."""
+    env_value = os.getenv('RATE_LIMITS_JSON')
+    if env_value:
+        try:
+            return json.loads(env_value)
+        except json.JSONDecodeError:
+            logger.warning("Invalid RATE_LIMITS_JSON, using default rate limits")
+    return _DEFAULT_RATE_LIMITS
+
+
+RATE_LIMITS = _load_rate_limits()
+
+
+def _result(allowed: bool, remaining: int, reset_in: int, max_calls: int) -> Dict:
+    """Build a check_rate_limit result."""
+    return {'allowed': allowed, 'remaining': remaining, 'reset_in': reset_in, 'max': max_calls}
+
 
 class RateLimiter:
     """Rate limiting system with configurable limits per command."""
 
-    RATE_LIMITS = None
-
-    @classmethod
-    def load_rate_limits(cls):
-        if cls.RATE_LIMITS is None:
-            import json
-            default_limits = {
-                'draw': {
-                    'default': {'calls': 10, 'period': 60},
-                    'premium': {'calls': 30, 'period': 60}
-                },
-                'snapshot': {
-                    'default': {'calls': 5, 'period': 300},
-                    'premium': {'calls': 15, 'period': 300}
-                },
-                'default': {
-                    'default': {'calls': 30, 'period': 60},
-                    'premium': {'calls': 60, 'period': 60}
-                }
-            }
-            env_value = os.getenv('RATE_LIMITS_JSON')
-            if env_value:
-                try:
-                    cls.RATE_LIMITS = json.loads(env_value)
-                except json.JSONDecodeError:
-                    cls.RATE_LIMITS = default_limits
-            else:
-                cls.RATE_LIMITS = default_limits
-        return cls.RATE_LIMITS
-
     def __init__(self):
         self.db = get_db()
         self.rate_limits_collection = self.db.collection('rate_limits')
@@ -72,94 +71,74 @@ class RateLimiter:
         Returns:
             Dict with keys: allowed (bool), remaining (int), reset_in (int), max (int)
         """
-        rate_limits = self.load_rate_limits()
-
         # --- Get rate limit config ---
-        command_limits = rate_limits.get(command, rate_limits['default'])
+        command_limits = RATE_LIMITS.get(command, RATE_LIMITS['default'])
         limit_type = 'premium' if is_premium else 'default'
         config = command_limits[limit_type]
 
         max_calls = config['calls']
         period_seconds = config['period']
 
-        # --- Get rate limit document ---
+        # --- Read-modify-write in one transaction ---
+        # Concurrent checks for the same user/command retry on conflict
+        # instead of overwriting each other's calls array.
         limit_key = f"{user_id}_{command}"
         limit_ref = self.rate_limits_collection.document(limit_key)
-        limit_doc = limit_ref.get()
-
-        current_time = time.time()
-
-        if not limit_doc.exists:
-            # --- First call - create record ---
-            limit_ref.set({
-                'user_id': user_id,
-                'command': command,
-                'calls': [current_time],
-                'created_at': firestore.SERVER_TIMESTAMP
-            })
-
-            result = {
-                'allowed': True,
-                'remaining': max_calls - 1,
-                'reset_in': period_seconds,
-                'max': max_calls
-            }
 
-            logger.debug(
-                "Rate limit check: first call",
+        @firestore.transactional
+        def check_in_transaction(transaction):
+            limit_doc = limit_ref.get(transaction=transaction)
+            current_time = time.time()
+
+            if not limit_doc.exists:
+                # --- First call - create record ---
+                transaction.set(limit_ref, {
+                    'user_id': user_id,
+                    'command': command,
+                    'calls': [current_time],
+                    'created_at': firestore.SERVER_TIMESTAMP
+                })
+                return _result(True, max_calls - 1, period_seconds, max_calls)
+
+            # --- Remove old calls outside the time window ---
+            calls = limit_doc.to_dict().get('calls', [])
+            cutoff_time = current_time - period_seconds
+            recent_calls = [call_time for call_time in calls if call_time > cutoff_time]
+
+            if len(recent_calls) >= max_calls:
+                # --- Rate limit exceeded ---
+                # Calls are appended in time order: a slot frees up when the
+                # max_calls-th most recent call leaves the window
+                oldest_call = recent_calls[-max_calls]
+                return _result(
+                    False, 0, int(oldest_call + period_seconds - current_time), max_calls
+                )
+
+            # --- Add current call ---
+            # Only the last max_calls entries can affect a future decision
+            recent_calls.append(current_time)
+            recent_calls = recent_calls[-max_calls:]
+            transaction.update(limit_ref, {'calls': recent_calls})
+            return _result(True, max_calls - len(recent_calls), period_seconds, max_calls)
+
+        result = check_in_transaction(self.db.transaction())
+
+        if not result['allowed']:
+            logger.warning(
+                "Rate limit exceeded",
                 correlation_id=correlation_id,
                 user_id=user_id,
                 command=command,
-                remaining=result['remaining']
+                reset_in=result['reset_in']
             )
-            return result
-
-        # --- Get existing calls ---
-        data = limit_doc.to_dict()
-        calls = data.get('calls', [])
-
-        # --- Remove old calls outside the time window ---
-        cutoff_time = current_time - period_seconds
-        recent_calls = [call_time for call_time in calls if call_time > cutoff_time]
-
-        if len(recent_calls) >= max_calls:
-            # --- Rate limit exceeded ---
-            oldest_call = min(recent_calls)
-            reset_in = int(oldest_call + period_seconds - current_time)
-
-            result = {
-                'allowed': False,
-                'remaining': 0,
-                'reset_in': reset_in,
-                'max': max_calls
-            }
-            logger.warning(
-                "Rate limit exceeded",
+        else:
+            logger.debug(
+                "Rate limit check: allowed",
                 correlation_id=correlation_id,
                 user_id=user_id,
                 command=command,
-                reset_in=reset_in
+                remaining=result['remaining']
             )
-            return result
-
-        # --- Add current call ---
-        recent_calls.append(current_time)
-        limit_ref.update({'calls': recent_calls})
-
-        result = {
-            'allowed': True,
-            'remaining': max_calls - len(recent_calls),
-            'reset_in': period_seconds,
-            'max': max_calls
-        }
-
-        logger.debug(
-            "Rate limit check: allowed",
-            correlation_id=correlation_id,
-            user_id=user_id,
-            command=command,
-            remaining=result['remaining']
-        )
         return result
 
     def reset_limits(
@@ -188,11 +167,18 @@ class RateLimiter:
             )
         else:
             # --- Reset all limits for user ---
+            # Deletes are committed in write batches (Firestore caps a batch at 500)
             query = self.rate_limits_collection.where('user_id', '==', user_id)
+            batch = self.db.batch()
             deleted_count = 0
             for doc in query.stream():
-                doc.reference.delete()
+                batch.delete(doc.reference)
                 deleted_count += 1
+                if deleted_count % 500 == 0:
+                    batch.commit()
+                    batch = self.db.batch()
+            if deleted_count % 500:
+                batch.commit()
 
             logger.info(
                 "Rate limits reset for user",
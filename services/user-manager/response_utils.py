@@ -0,0 +1,30 @@
+"""Response utilities."""
+from datetime import datetime
+
+import orjson
+from flask import Response
+
+
+def _json_default(value):
+    """Serialize types orjson does not handle natively.
+
+    Firestore timestamps are ``datetime`` subclasses, which orjson rejects;
+    they are emitted as ``isoformat()`` strings.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError
+
+
+def json_response(payload, status_code: int = 200) -> Response:
+    """Build a JSON response with the given status code.
+
+    Args:
+        payload: JSON-serializable body
+        status_code: HTTP status code
+
+    Returns:
+        Flask Response
+    """
+    body = orjson.dumps(payload, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    return Response(body, status=status_code, mimetype='application/json')
@@ -3,14 +3,26 @@ Utility client used by processors to talk to the user-manager service.
 Shared across all processor services.
 """
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, Any, List
+import orjson
 import requests
-from google.auth.transport import requests as google_requests
-from google.oauth2 import id_token
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from shared.observability import init_observability
+from shared.processor_utils import get_auth_token
 
 logger, _ = init_observability('shared-user-client', app=None)
 DEFAULT_TIMEOUT = float(os.getenv('USER_MANAGER_TIMEOUT', '5'))
+# Connects fail fast on a dead backend; the read keeps the full budget
+DEFAULT_CONNECT_TIMEOUT = float(os.getenv('USER_MANAGER_CONNECT_TIMEOUT', '0.5'))
+DEFAULT_READ_TIMEOUT = float(os.getenv('USER_MANAGER_READ_TIMEOUT', str(DEFAULT_TIMEOUT)))
+# Parallel lookups per get_users call (stays below the 50-connection pool)
+USER_FETCH_CONCURRENCY = int(os.getenv('USER_FETCH_CONCURRENCY', '16'))
+# Users reported as banned skip the rate-limit call for this long (seconds)
+BANNED_CACHE_TTL = float(os.getenv('BANNED_CACHE_TTL', '30'))
 
 
 class UserManagementClient:
@@ -29,26 +41,32 @@ class UserManagementClient:
         elif env_url.startswith('http://'):
             env_url = env_url.replace('http://', 'https://', 1)
         self.base_url = env_url
-        self._auth_request = google_requests.Request()
+        # (token, headers) pair reused until the identity token is refreshed
+        self._auth_headers = (None, {})
+        # user_id -> monotonic expiry of a ban seen on the rate-limit endpoint
+        self._banned_until: Dict[str, float] = {}
+        self._banned_lock = threading.Lock()
+        # Keep-alive pool reused by every call made through this client
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=50,
+            max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504],
+                              raise_on_status=False)
+        ))
 
     def _build_headers(self, correlation_id: Optional[str] = None) -> Dict[str, str]:
-        headers = {}
+        # Cached per audience in processor_utils until shortly before expiry;
+        # the Authorization header is only rebuilt when the token changes
+        token = get_auth_token(self.base_url, logger)
+        cached_token, base_headers = self._auth_headers
+        if token != cached_token:
+            base_headers = {'Authorization': f'Bearer {token}'} if token else {}
+            self._auth_headers = (token, base_headers)
+
+        headers = dict(base_headers)
         if correlation_id:
             headers['X-Correlation-ID'] = correlation_id
-
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(self.base_url)
-            normalized_audience = f"{parsed.scheme}://{parsed.netloc}"
-
-            token = id_token.fetch_id_token(self._auth_request, normalized_audience)
-            headers['Authorization'] = f'Bearer {token}'
-        except Exception as e:
-            logger.warning(
-                "Failed to fetch identity token for user-manager",
-                error=e,
-                base_url=self.base_url
-            )
         return headers
 
     def _make_request(
@@ -56,6 +74,7 @@ class UserManagementClient:
         method: str,
         endpoint: str,
         correlation_id: Optional[str] = None,
+        banned_on_403: bool = False,
         **kwargs
     ) -> Optional[Dict]:
         url = f"{self.base_url}{endpoint}"
@@ -63,20 +82,29 @@ class UserManagementClient:
         headers.update(kwargs.pop('headers', {}))
 
         try:
-            response = requests.request(
-                method, url, headers=headers, timeout=DEFAULT_TIMEOUT, **kwargs
+            response = self._session.request(
+                method, url, headers=headers,
+                timeout=(DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT), **kwargs
             )
             # Accept 200-299 (success) and 429 (rate limited) status codes
             if 200 <= response.status_code < 300 or response.status_code == 429:
-                return response.json()
-            else:
-                logger.warning(
-                    f"User-manager {method} {endpoint} returned {response.status_code}",
-                    correlation_id=correlation_id,
-                    status_code=response.status_code,
-                    response_text=response.text[:200]
-                )
-                return None
+                return orjson.loads(response.content)
+            # A 403 is a ban only when the caller expects one and the body
+            # says so; IAM/front-end 403s (often HTML) are auth failures
+            if response.status_code == 403 and banned_on_403:
+                try:
+                    body = orjson.loads(response.content)
+                except orjson.JSONDecodeError:
+                    body = None
+                if isinstance(body, dict) and body.get('banned'):
+                    return body
+            logger.warning(
+                f"User-manager {method} {endpoint} returned {response.status_code}",
+                correlation_id=correlation_id,
+                status_code=response.status_code,
+                response_text=response.text[:200]
+            )
+            return None
         except Exception as e:
             logger.error(
                 f"Error calling user-manager {method} {endpoint}",
@@ -94,20 +122,31 @@ class UserManagementClient:
     ) -> Dict[str, Any]:
         """Check if user can execute command (rate limit check).
 
-        Note: The server-side endpoint already fetches user data, so we don't need
-        to fetch it separately. We pass is_premium=False as default, and the server
-        will use the actual value from the database.
+        Note: The server-side endpoint fetches the user record itself to resolve
+        premium and banned status, so no separate user lookup is needed. Users
+        it reports as banned are denied locally for BANNED_CACHE_TTL seconds
+        without calling it again.
         """
+        with self._banned_lock:
+            banned_until = self._banned_until.get(user_id)
+            if banned_until is not None:
+                if time.monotonic() < banned_until:
+                    return {'allowed': False, 'banned': True, 'error': 'User is banned', 'remaining': 0}
+                del self._banned_until[user_id]
+
         result = self._make_request(
             'POST',
             '/api/rate-limit/check',
             correlation_id=correlation_id,
+            banned_on_403=True,
             json={
                 'user_id': user_id,
-                'command': command,
-                'is_premium': False
+                'command': command
             }
         )
+        if result and result.get('banned'):
+            with self._banned_lock:
+                self._banned_until[user_id] = time.monotonic() + BANNED_CACHE_TTL
         return result or {'allowed': True}
 
     def increment_usage(
@@ -164,10 +203,10 @@ class UserManagementClient:
         command: str,
         correlation_id: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Get rate limit information for a user and command."""
-        user = self._make_request('GET', f'/api/users/{user_id}', correlation_id=correlation_id)
-        is_premium = user.get('is_premium', False) if user else False
+        """Get rate limit information for a user and command.
 
+        Premium status is resolved server-side from the user record.
+        """
         result = self._make_request(
             'GET',
             f'/api/rate-limit/{user_id}?command={command}',
@@ -188,6 +227,30 @@ class UserManagementClient:
         )
         return result is not None and result.get('registered', False)
 
+    def get_users(
+        self,
+        user_ids: List[str],
+        correlation_id: Optional[str] = None
+    ) -> Dict[str, Optional[Dict]]:
+        """Fetch several users concurrently.
+
+        Args:
+            user_ids: User IDs to fetch
+            correlation_id: Correlation ID for logging
+
+        Returns:
+            Dict mapping each user ID to its user data, or None if unavailable
+        """
+        if not user_ids:
+            return {}
+
+        def fetch(user_id: str) -> Optional[Dict]:
+            return self._make_request('GET', f'/api/users/{user_id}', correlation_id=correlation_id)
+
+        workers = max(1, min(USER_FETCH_CONCURRENCY, len(user_ids)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(user_ids, executor.map(fetch, user_ids)))
+
     def get_leaderboard(
         self,
         limit: int = 10,
@@ -4,20 +4,16 @@ from datetime import datetime, timedelta, timezone
 from typing import List, Dict
 from google.cloud import firestore
 from cache import cache
+from shared.firestore_client import get_db
 from shared.observability import init_observability
 
 logger, _ = init_observability('user-management-service', app=None)
 
-_db_client = None
 
-
-def get_db():
-    """Get Firestore client singleton."""
-    global _db_client
-    if _db_client is None:
-        database_id = os.getenv('FIRESTORE_DATABASE', 'guidon-db')
-        _db_client = firestore.Client(database=database_id)
-    return _db_client
+# --- Leaderboard ---
+# Only these fields are read from Firestore for leaderboard entries
+_LEADERBOARD_FIELDS = ['user_id', 'username', 'total_draws', 'is_premium', 'avatar', 'discriminator']
+LEADERBOARD_MAX_LIMIT = int(os.getenv('LEADERBOARD_MAX_LIMIT', '100'))
 
 
 class StatsManager:
@@ -44,8 +40,8 @@ class StatsManager:
             )
             return cached
 
-        # --- Count users (expensive operation) ---
-        count = len(list(self.db.collection('users').stream()))
+        # --- Count users server-side (no documents are streamed) ---
+        count = self.db.collection('users').count().get()[0][0].value
 
         # --- Cache for 5 minutes ---
         cache.set("stats:user_count", count, ttl=300)
@@ -72,8 +68,10 @@ class StatsManager:
             Number of active users
         """
         cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
-        query = self.db.collection('users').where('updated_at', '>', cutoff)
-        count = len(list(query.stream()))
+        query = self.db.collection('users').where(
+            filter=firestore.FieldFilter('updated_at', '>', cutoff)
+        )
+        count = query.count().get()[0][0].value
 
         logger.info(
             "Active users retrieved",
@@ -91,27 +89,29 @@ class StatsManager:
         """Get top users by draw count.
 
         Args:
-            limit: Number of users to return (default: 10)
+            limit: Number of users to return (default: 10, clamped to
+                1..LEADERBOARD_MAX_LIMIT)
             correlation_id: Correlation ID for logging
 
         Returns:
             List of user dicts with leaderboard data
         """
-        users = self.db.collection('users').order_by(
+        limit = max(1, min(limit, LEADERBOARD_MAX_LIMIT))
+        users = self.db.collection('users').select(_LEADERBOARD_FIELDS).order_by(
             'total_draws', direction=firestore.Query.DESCENDING
         ).limit(limit).stream()
 
-        leaderboard = []
-        for doc in users:
-            data = doc.to_dict()
-            leaderboard.append({
+        leaderboard = [
+            {
                 'user_id': data.get('user_id'),
                 'username': data.get('username'),
                 'total_draws': data.get('total_draws', 0),
                 'is_premium': data.get('is_premium', False),
                 'avatar': data.get('avatar'),
                 'discriminator': data.get('discriminator', '0')
-            })
+            }
+            for data in (doc.to_dict() for doc in users)
+        ]
 
         logger.info(
             "Leaderboard retrieved",
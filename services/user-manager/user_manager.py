@@ -1,23 +1,17 @@
 """User management for Firestore."""
-import os
-from typing import Optional, Dict
+from datetime import datetime, timezone
+from typing import Optional, Dict, List
 from google.cloud import firestore
 from cache import cache
+from shared.firestore_client import get_db
 from shared.observability import init_observability
 
 logger, _ = init_observability('user-management-service', app=None)
 
-_db_client = None
-
-
-def get_db():
-    """Get Firestore client singleton."""
-    global _db_client
-    if _db_client is None:
-        database_id = os.getenv('FIRESTORE_DATABASE', 'guidon-db')
-        _db_client = firestore.Client(database=database_id)
-    return _db_client
-
+# Cached marker for users known not to exist, kept briefly so repeated
+# lookups of unregistered users skip Firestore
+_USER_NOT_FOUND = object()
+USER_NOT_FOUND_TTL = 5
 
 class UserManager:
     """Manages user data in Firestore."""
@@ -41,6 +35,8 @@ class UserManager:
         if use_cache:
             cache_key = f"user:{user_id}"
             cached = cache.get(cache_key)
+            if cached is _USER_NOT_FOUND:
+                return None
             if cached is not None:
                 logger.debug(
                     "User retrieved from cache",
@@ -71,6 +67,8 @@ class UserManager:
                 user_id=user_id,
                 collection_id=self.users_collection.id
             )
+            if use_cache:
+                cache.set(f"user:{user_id}", _USER_NOT_FOUND, ttl=USER_NOT_FOUND_TTL)
 
         logger.warning(
             "User not found",
@@ -111,7 +109,7 @@ class UserManager:
             user_data.setdefault('is_banned', False)
             user_data.setdefault('is_premium', False)
             user_data['created_at'] = firestore.SERVER_TIMESTAMP
-            logger.info(
+            logger.debug(
                 "Creating new user",
                 correlation_id=correlation_id,
                 user_id=user_id,
@@ -121,7 +119,7 @@ class UserManager:
             for field in ('total_draws', 'is_banned', 'is_premium'):
                 if field not in user_data and existing.get(field) is not None:
                     user_data[field] = existing[field]
-            logger.info(
+            logger.debug(
                 "Updating existing user",
                 correlation_id=correlation_id,
                 user_id=user_id,
@@ -141,24 +139,6 @@ class UserManager:
 
             doc_ref = self.users_collection.document(user_id)
             doc_ref.set(user_data, merge=True)
-
-            verify_doc = doc_ref.get()
-            if verify_doc.exists:
-                logger.info(
-                    "User saved to Firestore successfully",
-                    correlation_id=correlation_id,
-                    user_id=user_id,
-                    username=username,
-                    document_exists=True
-                )
-            else:
-                logger.error(
-                    "User document does not exist after save",
-                    correlation_id=correlation_id,
-                    user_id=user_id,
-                    username=username
-                )
-                raise Exception("Failed to create user document in Firestore")
         except Exception as e:
             logger.error(
                 "Failed to save user to Firestore",
@@ -172,38 +152,14 @@ class UserManager:
         # --- Invalidate cache ---
         cache.delete(f"user:{user_id}")
 
-        logger.info(
-            "Cache invalidated",
-            correlation_id=correlation_id,
-            user_id=user_id
-        )
-
-        # --- Retrieve saved user to get actual timestamps (not Sentinel objects) ---
-        import time
-        time.sleep(0.1)
-
-        saved_user = self.get_user(user_id, use_cache=False, correlation_id=correlation_id)
-        if saved_user:
-            logger.info(
-                "User retrieved after save",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                has_created_at='created_at' in saved_user
-            )
-            return saved_user
-        else:
-            logger.warning(
-                "User not found immediately after save, returning user_data",
-                correlation_id=correlation_id,
-                user_id=user_id
-            )
-            clean_data = {}
-            for k, v in user_data.items():
-                if v == firestore.SERVER_TIMESTAMP:
-                    clean_data[k] = None
-                else:
-                    clean_data[k] = v
-            return clean_data
+        # --- Build the saved user locally ---
+        # set() either succeeds or raises, so there is nothing to re-read;
+        # server timestamps are approximated with the local clock
+        now = datetime.now(timezone.utc)
+        saved_user = dict(existing) if existing else {}
+        for k, v in user_data.items():
+            saved_user[k] = now if v is firestore.SERVER_TIMESTAMP else v
+        return saved_user
 
     def increment_usage(
         self,
@@ -236,7 +192,10 @@ class UserManager:
             try:
                 updated_doc = doc_ref.get()
                 if updated_doc.exists:
-                    new_total = updated_doc.to_dict().get('total_draws', 0)
+                    # Reuse the read-back so a following get_user is a cache hit
+                    user_data = updated_doc.to_dict()
+                    cache.set(f"user:{user_id}", user_data, ttl=60)
+                    new_total = user_data.get('total_draws', 0)
                     logger.debug(
                         "User usage incremented",
                         correlation_id=correlation_id,
@@ -273,6 +232,54 @@ class UserManager:
             )
             return None
 
+    def increment_usage_bulk(
+        self,
+        increments: List[Dict],
+        correlation_id: Optional[str] = None
+    ) -> int:
+        """Apply a batch of usage increments in a single Firestore write batch.
+
+        Args:
+            increments: List of {'user_id', 'command', 'count'} dicts
+            correlation_id: Correlation ID for logging
+
+        Returns:
+            Number of user documents updated
+        """
+        # --- Aggregate per user ---
+        draws_by_user: Dict[str, int] = {}
+        for item in increments:
+            user_id = item.get('user_id') if isinstance(item, dict) else None
+            if not user_id:
+                continue
+            count = item.get('count', 1)
+            if not isinstance(count, int) or count < 1:
+                count = 1
+            draws = count if item.get('command') == 'draw' else 0
+            draws_by_user[str(user_id)] = draws_by_user.get(str(user_id), 0) + draws
+
+        # --- Write (Firestore batches are atomic, capped at 500 writes) ---
+        user_ids = list(draws_by_user)
+        for start in range(0, len(user_ids), 500):
+            batch = self.db.batch()
+            for user_id in user_ids[start:start + 500]:
+                updates = {'updated_at': firestore.SERVER_TIMESTAMP}
+                if draws_by_user[user_id]:
+                    updates['total_draws'] = firestore.Increment(draws_by_user[user_id])
+                batch.set(self.users_collection.document(user_id), updates, merge=True)
+            batch.commit()
+
+        for user_id in user_ids:
+            cache.delete(f"user:{user_id}")
+
+        logger.debug(
+            "User usage incremented (bulk)",
+            correlation_id=correlation_id,
+            users=len(user_ids),
+            increments=len(increments)
+        )
+        return len(user_ids)
+
     def ban_user(
         self,
         user_id: str,
@@ -149,6 +149,9 @@ module "functions" {
   labels                = merge(var.labels, coalesce(each.value.labels, {}))
   secret_env            = coalesce(each.value.secret_env, [])
   bucket_name           = google_storage_bucket.cf_src.name
+
+  max_instance_request_concurrency = coalesce(each.value.concurrency, 1)
+  available_cpu                    = each.value.cpu
   service_account_email = module.service_accounts["cloud-functions"].email
 
   # Configuration de l'accès : par défaut privé (pas d'accès public)
@@ -97,6 +97,12 @@ resource "google_cloudfunctions2_function" "function" {
     all_traffic_on_latest_revision = true
     service_account_email          = var.service_account_email
 
+    # Concurrent requests per instance require at least one full vCPU;
+    # THREADS sizes the gunicorn thread pool to match.
+    max_instance_request_concurrency = var.max_instance_request_concurrency
+    available_cpu                    = var.available_cpu
+    environment_variables            = var.max_instance_request_concurrency > 1 ? { THREADS = tostring(var.max_instance_request_concurrency) } : {}
+
     dynamic "secret_environment_variables" {
       for_each = var.secret_env
       content {
@@ -55,6 +55,18 @@ variable "secret_env" {
   default = []
 }
 
+variable "max_instance_request_concurrency" {
+  description = "Nombre de requêtes traitées simultanément par instance (> 1 nécessite available_cpu >= 1)"
+  type        = number
+  default     = 1
+}
+
+variable "available_cpu" {
+  description = "CPU alloué par instance (ex: \"1\"). Null = valeur par défaut liée à la mémoire."
+  type        = string
+  default     = null
+}
+
 variable "service_account_email" {
   description = "Email du service account à utiliser pour la Cloud Function"
   type        = string
@@ -49,6 +49,8 @@ variable "functions" {
     runtime             = optional(string)
     labels              = optional(map(string))
     authorized_invokers = optional(list(string)) # Liste des service accounts autorisés (ex: ["api-gateway", "pubsub"])
+    concurrency         = optional(number)       # Requêtes simultanées par instance (défaut: 1)
+    cpu                 = optional(string)       # CPU par instance, requis >= "1" si concurrency > 1
     secret_env = optional(list(object({
       key     = string
       secret  = string
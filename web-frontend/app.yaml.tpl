@@ -1,5 +1,11 @@
 runtime: python310
-entrypoint: gunicorn -b :$PORT --timeout 60 --workers 2 main:app
+entrypoint: gunicorn -b :$PORT --timeout 60 --workers 1 --threads 16 main:app
+
+# Webhook responses and long-polls share one in-memory store, so a single
+# instance must own it; at most one request per gunicorn thread
+automatic_scaling:
+  max_instances: 1
+  max_concurrent_requests: 16
 
 env_variables:
   GATEWAY_URL: ${GATEWAY_URL}
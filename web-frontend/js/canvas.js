@@ -267,6 +267,7 @@ function stopAutoRefresh() {
  * @param {number} options.maxDelay - Maximum delay in ms (default: 2000)
  * @param {number} options.backoffMultiplier - Multiplier for exponential backoff (default: 1.5)
  * @param {number} options.jitterMax - Maximum jitter in ms to add (default: 100)
+ * @param {number} options.longPollSeconds - Seconds the first request waits server-side for the response (default: 8, server cap RESPONSE_WAIT_MAX)
  * @param {Function} options.checkResponse - Function to check if response is complete
  * @param {Function} options.onSuccess - Callback when response is received
  * @param {Function} options.onError - Callback when error occurs
@@ -279,14 +280,16 @@ async function pollWithEarlyTermination(token, options = {}) {
         maxDelay = 2000,
         backoffMultiplier = 1.5,
         jitterMax = 100,
+        longPollSeconds = 8,
         checkResponse = (data) => data.status !== 'pending' && data.status !== 'processing',
         onSuccess = null,
         onError = null
     } = options;
 
-    // Early termination: Check immediately before first delay
+    // Early termination: long-poll before the first delay so that most
+    // responses complete in a single request
     try {
-        const immediateResponse = await fetch(`/response/${token}`);
+        const immediateResponse = await fetch(`/response/${token}?wait=${longPollSeconds}`);
         if (immediateResponse.status === 200) {
             const data = await immediateResponse.json();
             if (checkResponse(data)) {
@@ -1,9 +1,11 @@
 """Web frontend for Guidon - Canvas drawing interface."""
+import math
 import os
 import sys
 import time
 import threading
 import json
+from collections import OrderedDict
 from flask import Flask, request as flask_request, make_response, jsonify, send_from_directory
 import requests
 
@@ -14,18 +16,41 @@ from shared.correlation import with_correlation
 app = Flask(__name__)
 logger, tracing = init_observability('web-frontend', app=None)
 
-responses = {}
+# Webhook responses by token, oldest first. Bounded by RESPONSE_MAX_ENTRIES
+# so tokens that are never polled cannot grow memory without limit.
+responses = OrderedDict()
 responses_lock = threading.Lock()
+responses_ready = threading.Condition(responses_lock)
+
+RESPONSE_TTL_SECONDS = 300
+RESPONSE_MAX_ENTRIES = int(os.environ.get('RESPONSE_MAX_ENTRIES', '1000'))
+
+# Upper bound (seconds) a GET /response/<token>?wait=N long-poll may block.
+# Kept short: every waiting poll holds one of the instance's gunicorn threads.
+RESPONSE_WAIT_MAX = float(os.environ.get('RESPONSE_WAIT_MAX', '8'))
+
+
+def _response_ready(token: str) -> bool:
+    """True once a final (non-processing) response is stored (lock must be held)."""
+    entry = responses.get(token)
+    return entry is not None and entry.get('data', {}).get('status') != 'processing'
+
+
+def _evict_responses(now: float):
+    """Drop expired responses and enforce the size cap (lock must be held)."""
+    while responses:
+        token, entry = next(iter(responses.items()))
+        if now - entry['timestamp'] <= RESPONSE_TTL_SECONDS and len(responses) <= RESPONSE_MAX_ENTRIES:
+            break
+        del responses[token]
+
 
 def cleanup_responses():
     """Cleanup old responses."""
     while True:
         time.sleep(60)
         with responses_lock:
-            now = time.time()
-            to_remove = [k for k, v in responses.items() if now - v['timestamp'] > 300]
-            for k in to_remove:
-                del responses[k]
+            _evict_responses(time.monotonic())
 
 cleanup_thread = threading.Thread(target=cleanup_responses, daemon=True)
 cleanup_thread.start()
@@ -79,12 +104,16 @@ def webhook_handler():
             data_keys=list(data.keys())[:10]
         )
 
-        # Store response for polling
-        with responses_lock:
+        # Store response for polling and wake up any long-poll waiting on it
+        with responses_ready:
+            now = time.monotonic()
             responses[token] = {
                 'data': data,
-                'timestamp': time.time()
+                'timestamp': now
             }
+            responses.move_to_end(token)
+            _evict_responses(now)
+            responses_ready.notify_all()
             logger.info(
                 "Stored webhook response",
                 correlation_id=correlation_id,
@@ -104,16 +133,34 @@ def webhook_handler():
 @traced_function("get_response")
 @with_correlation(logger)
 def get_response(token):
-    """Return stored webhook response for a token."""
+    """Return stored webhook response for a token.
+
+    With ``?wait=N`` the request long-polls: it blocks up to N seconds
+    (capped by RESPONSE_WAIT_MAX) until the processor webhook delivers the
+    final response, instead of forcing the client to poll repeatedly. An
+    intermediate 'processing' entry does not end the wait.
+    """
     correlation_id = getattr(flask_request, 'correlation_id', flask_request.headers.get('X-Correlation-ID'))
 
+    try:
+        wait = float(flask_request.args.get('wait', 0))
+    except ValueError:
+        wait = 0.0
+    # nan/inf would slip through the clamp and block wait_for() forever
+    if not math.isfinite(wait):
+        wait = 0.0
+    wait = min(max(wait, 0.0), RESPONSE_WAIT_MAX)
+
     logger.info(
         "GET /response/<token> called",
         correlation_id=correlation_id,
-        token=token
+        token=token,
+        wait=wait
     )
 
-    with responses_lock:
+    with responses_ready:
+        if wait:
+            responses_ready.wait_for(lambda: _response_ready(token), timeout=wait)
         entry = responses.get(token)
         available_tokens = list(responses.keys())[:10]  # Log first 10 tokens for debugging
 